@@ -4,22 +4,90 @@ Provides endpoints to trigger scraper and check status
 """
 
 
-from flask import Flask, jsonify, request
+from flask import Blueprint, Flask, Response, request, stream_with_context
 from flask_cors import CORS
-import subprocess
+from flask_compress import Compress
+import asyncio
+import locale
 import os
+import orjson
+import signal
+import subprocess
 import threading
 import sys
 import time
 import queue
-import schedule
-from datetime import datetime
+import atexit
+import bisect
+import functools
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque, defaultdict
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+from dotenv import load_dotenv
+from supabase import create_client
 
 # Import URL detection and routing utilities
 from utils.url_detector import URLDetector
 from utils.table_router import TableRouter
+from utils.supabase_utils import is_missing_function
+
+# Make console output encoding-safe once at startup (Windows consoles default to cp1252) so the
+# log writer can print emojis without per-line error handling; UTF-8 streams are left alone
+if not (sys.stdout.encoding or "").lower().replace("-", "").startswith("utf") and hasattr(sys.stdout, "reconfigure"):
+    sys.stdout.reconfigure(encoding="utf-8", errors="replace")
+
+load_dotenv()
+
+# Shared Supabase client for the stats endpoint (None when credentials aren't configured)
+SUPABASE_URL = os.environ.get("SUPABASE_URL")
+SUPABASE_KEY = os.environ.get("SUPABASE_KEY") or os.environ.get("SUPABASE_SERVICE_KEY") or os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+SUPABASE = create_client(SUPABASE_URL, SUPABASE_KEY) if SUPABASE_URL and SUPABASE_KEY else None
 
 app = Flask(__name__)
+
+def _json(data, status=200):
+    """JSON response serialized with orjson (faster than jsonify on the polled endpoints)"""
+    return app.response_class(orjson.dumps(data), status=status, mimetype='application/json')
+
+def ttl_cache(seconds):
+    """Serve a view's last 200 response body for `seconds` instead of recomputing it.
+    
+    Polling dashboards hit these endpoints every few seconds; bursts within the TTL collapse
+    into one computation. Call view.invalidate() to force the next request to recompute.
+    
+    Each invalidate() bumps a generation counter; a body is only stored if no invalidation
+    happened while it was being computed, so a snapshot taken just before a change can't be
+    cached after it.
+    """
+    def decorator(view):
+        cached = [(0.0, None)]  # (expiry, body), swapped as one tuple so readers never see half an update
+        generation = [0]
+        lock = threading.Lock()
+        
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            expiry, body = cached[0]
+            if body is not None and time.monotonic() < expiry:
+                return app.response_class(body, mimetype='application/json')
+            started = generation[0]
+            response = app.make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                body = response.get_data()
+                with lock:
+                    if generation[0] == started:
+                        cached[0] = (time.monotonic() + seconds, body)
+            return response
+        
+        def invalidate():
+            with lock:
+                generation[0] += 1
+                cached[0] = (0.0, None)
+        
+        wrapper.invalidate = invalidate
+        return wrapper
+    return decorator
 # Enable CORS for all routes - allows frontend to call backend API
 # Explicitly allow all origins and methods for Railway deployment
 CORS(app, resources={
@@ -30,113 +98,341 @@ CORS(app, resources={
     }
 })
 
+# Compress JSON replies (log dumps and status snapshots shrink several-fold) for clients that
+# accept it. Streamed responses are left alone: Flask-Compress would buffer the whole stream
+# to compress it, which would hold back the SSE and NDJSON endpoints.
+app.config['COMPRESS_MIMETYPES'] = ['application/json']
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_STREAMS'] = False
+Compress(app)
+
 # Global status dictionaries
-scraper_status = {"running": False, "last_run": None, "last_result": None, "error": None}
-apartments_scraper_status = {"running": False, "last_run": None, "last_result": None, "error": None}
-zillow_fsbo_status = {"running": False, "last_run": None, "last_result": None, "error": None}
-zillow_frbo_status = {"running": False, "last_run": None, "last_result": None, "error": None}
-hotpads_status = {"running": False, "last_run": None, "last_result": None, "error": None}
-redfin_status = {"running": False, "last_run": None, "last_result": None, "error": None}
-trulia_status = {"running": False, "last_run": None, "last_result": None, "error": None}
+def _new_status():
+    return {"running": False, "last_run": None, "last_result": None, "error": None}
+
+# One status dict per process, keyed by the internal scraper name used in logs
+# ("FSBO", "Apartments", "Zillow_FSBO", ..., "Enrichment"); the known ones are created
+# below once the registry is defined, anything else on first access
+STATUSES = defaultdict(_new_status)
 all_scrapers_status = {"running": False, "last_run": None, "finished_at": None, "last_result": None, "error": None, "current_scraper": None, "completed": []}
-enrichment_status = {"running": False, "last_run": None, "last_result": None, "error": None}
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Scraper registry, keyed by the friendly ID used by the frontend, in sequential-run order.
+#   name:    internal name used for logs, STATUSES and active_processes
+#   label:   display name used in API messages
+#   cmd/dir: command and absolute working directory
+#   args:    (query param, spider argument, default) pairs passed as "-a arg=value" on manual triggers
+#   trigger/status: legacy URL rules (FSBO predates the naming scheme and has no status route)
+SCRAPERS = {
+    "fsbo": {
+        "name": "FSBO", "label": "FSBO",
+        "cmd": (sys.executable, "forsalebyowner_selenium_scraper.py"),
+        "dir": os.path.join(BASE_DIR, "FSBO_Scraper"),
+        "args": (),
+        "trigger": "/api/trigger", "status": None,
+    },
+    "apartments": {
+        "name": "Apartments", "label": "Apartments",
+        "cmd": (sys.executable, "-m", "scrapy", "crawl", "apartments_frbo"),
+        "dir": os.path.join(BASE_DIR, "Apartments_Scraper"),
+        "args": (("city", "city", "chicago-il"),),
+        "trigger": "/api/trigger-apartments", "status": "/api/status-apartments",
+    },
+    "zillow_fsbo": {
+        "name": "Zillow_FSBO", "label": "Zillow FSBO",
+        "cmd": (sys.executable, "-m", "scrapy", "crawl", "zillow_spider"),
+        "dir": os.path.join(BASE_DIR, "Zillow_FSBO_Scraper"),
+        "args": (("url", "start_url", None),),
+        "trigger": "/api/trigger-zillow-fsbo", "status": "/api/status-zillow-fsbo",
+    },
+    "zillow_frbo": {
+        "name": "Zillow_FRBO", "label": "Zillow FRBO",
+        "cmd": (sys.executable, "-m", "scrapy", "crawl", "zillow_spider"),
+        "dir": os.path.join(BASE_DIR, "Zillow_FRBO_Scraper"),
+        "args": (("url", "start_url", None),),
+        "trigger": "/api/trigger-zillow-frbo", "status": "/api/status-zillow-frbo",
+    },
+    "hotpads": {
+        "name": "Hotpads", "label": "Hotpads",
+        "cmd": (sys.executable, "-m", "scrapy", "crawl", "hotpads_scraper"),
+        "dir": os.path.join(BASE_DIR, "Hotpads_Scraper"),
+        "args": (),
+        "trigger": "/api/trigger-hotpads", "status": "/api/status-hotpads",
+    },
+    "redfin": {
+        "name": "Redfin", "label": "Redfin",
+        "cmd": (sys.executable, "-m", "scrapy", "crawl", "redfin_spider"),
+        "dir": os.path.join(BASE_DIR, "Redfin_Scraper"),
+        "args": (),
+        "trigger": "/api/trigger-redfin", "status": "/api/status-redfin",
+    },
+    "trulia": {
+        "name": "Trulia", "label": "Trulia",
+        "cmd": (sys.executable, "-m", "scrapy", "crawl", "trulia_spider"),
+        "dir": os.path.join(BASE_DIR, "Trulia_Scraper"),
+        "args": (),
+        "trigger": "/api/trigger-trulia", "status": "/api/status-trulia",
+    },
+}
+
+# Friendly scraper IDs used by the frontend -> internal scraper names
+SCRAPER_IDS = {scraper_id: scraper["name"] for scraper_id, scraper in SCRAPERS.items()}
+# Internal scraper names -> absolute working directories
+SCRAPER_DIRS = {scraper["name"]: scraper["dir"] for scraper in SCRAPERS.values()}
+
+# Owner-data enrichment worker, run from BASE_DIR; trigger-enrichment appends its --limit/--source args
+ENRICHMENT_CMD = (sys.executable, "batchdata_worker.py")
+
+for _name in (*SCRAPER_IDS.values(), "Enrichment"):
+    STATUSES[_name]
+del _name
+
+# Blocking background jobs started from the API (the sequential runner). Single scraper runs don't
+# need a thread: they live on the process loop (see start_process).
+# The "already running" check is the admission control; the pool just reuses threads.
+EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="scraper")
+atexit.register(EXECUTOR.shutdown, wait=False, cancel_futures=True)
+
+# Guards status transitions that must be check-and-set atomically
+_STATUS_LOCK = threading.Lock()
+# Set while a sequential "all scrapers" run is in progress; is_set() is a lock-free fast path
+_ALL_RUNNING = threading.Event()
+
+def _claim_process(name):
+    """Mark a scraper/enrichment run as started unless it already is; False if it was running.
+    
+    Check and set happen under _STATUS_LOCK so two concurrent triggers can't both start it.
+    """
+    with _STATUS_LOCK:
+        status_dict = STATUSES[name]
+        if status_dict["running"]:
+            return False
+        status_dict["running"] = True
+    _status_changed()
+    return True
 
 # Global process tracker for stopping
 active_processes = {}
 user_stopped_processes = set()  # Track processes stopped by user (to avoid logging as errors)
-stop_all_requested = False
+# Set by Stop All, cleared when a sequential run starts; waits between scrapers wake up on it immediately
+_STOP_EVENT = threading.Event()
 
 # Global Log Buffer
-# List of dicts: { "timestamp": iso_str, "message": str, "type": "info"|"error"|"success" }
-LOG_BUFFER = []
+# Stored column-wise (struct-of-arrays): one ring per field instead of one dict per entry.
+# Entry i is (_LOG_TS[i], _LOG_MSG[i], _LOG_TYPE[i]) with "type" in "info"|"error"|"success"|"warning"
 MAX_LOG_SIZE = 1000
+_LOG_TS = deque(maxlen=MAX_LOG_SIZE)
+_LOG_MSG = deque(maxlen=MAX_LOG_SIZE)
+_LOG_TYPE = deque(maxlen=MAX_LOG_SIZE)
+# The three rings must advance together, so appends and snapshots share one lock
+_LOG_LOCK = threading.Lock()
+# Sequence number of the newest entry; entries are numbered consecutively from 1, so the
+# buffered ones are _log_seq - len(_LOG_TS) + 1 .. _log_seq (only the writer thread advances it)
+_log_seq = 0
+# Canonical level strings so every entry references one of four shared objects
+_LOG_TYPES = {t: sys.intern(t) for t in ("info", "error", "success", "warning")}
+# Integer codes for the levels in /api/logs?format=compact (index into this tuple)
+LOG_LEVELS = tuple(_LOG_TYPES)
+_LOG_LEVEL_CODES = {t: i for i, t in enumerate(LOG_LEVELS)}
+
+# Producers (request handlers, scraper output readers) only enqueue; a single writer thread
+# appends to the buffer and prints, so a slow stdout can't stall the readers.
+# When the queue is full, new entries are dropped rather than growing memory.
+MAX_LOG_QUEUE = 10000
+_LOG_QUEUE = queue.Queue(maxsize=MAX_LOG_QUEUE)
 
 def add_log(message, type="info"):
     """Add a log entry to the buffer"""
-    entry = {
-        "timestamp": datetime.now().isoformat(),
-        "message": message,
-        "type": type
-    }
-    LOG_BUFFER.append(entry)
-    # Print to server console as well, handled gracefully for Windows encoding
+    type = _LOG_TYPES.get(type) or sys.intern(type)
     try:
-        print(f"[{entry['timestamp']}] [{type.upper()}] {message}")
-    except UnicodeEncodeError:
-        # Fallback for consoles that don't support special characters/emojis
-        clean_message = message.encode('ascii', 'ignore').decode('ascii')
-        print(f"[{entry['timestamp']}] [{type.upper()}] {clean_message}")
-    
-    # Keep buffer size manageable
-    if len(LOG_BUFFER) > MAX_LOG_SIZE:
-        LOG_BUFFER.pop(0)
+        _LOG_QUEUE.put_nowait((message, type))
+    except queue.Full:
+        pass  # Drop on overload
+
+# Per-client queues for the Server-Sent Events endpoints (/api/logs/stream, /api/events).
+# Items are (event, payload): ("log", (seq, timestamp, message, type)) or ("status", snapshot dict)
+_LOG_SUBSCRIBERS = set()
+_STATUS_SUBSCRIBERS = set()
+MAX_SUBSCRIBER_QUEUE = 1000
+
+# Each open stream holds a gunicorn thread for as long as the client stays connected, so the
+# number of concurrent streams is capped (gunicorn.conf.py sizes its thread pool from the same
+# setting); extra clients get a 503 and should fall back to polling
+MAX_STREAM_CLIENTS = int(os.environ.get("SSE_MAX_CLIENTS", "4"))
+_STREAM_SLOTS = threading.BoundedSemaphore(MAX_STREAM_CLIENTS)
+
+def _claim_stream_slot():
+    """Reserve a stream slot; returns its release function, or None if all slots are taken"""
+    if not _STREAM_SLOTS.acquire(blocking=False):
+        return None
+    released = threading.Event()
+    def release():
+        if not released.is_set():
+            released.set()
+            _STREAM_SLOTS.release()
+    return release
+
+def _stream_response(generate, release):
+    """text/event-stream response that frees its stream slot when the connection closes"""
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    # Runs on close even if the generator was never started (client gone before the first read)
+    response.call_on_close(release)
+    return response
 
-def stream_output(process, scraper_name):
+def _streams_full():
+    response = _json({"error": "Too many open streams, poll instead"}, 503)
+    response.headers['Retry-After'] = '30'
+    return response
+
+def _publish(subscribers, event, payload):
+    for subscriber in list(subscribers):
+        try:
+            subscriber.put_nowait((event, payload))
+        except queue.Full:
+            pass  # Slow client - it misses this event rather than holding up the publisher
+
+MAX_LOG_BATCH = 500
+
+def _log_writer():
+    """Single consumer: move queued entries into the buffer, print them and push them to stream clients"""
+    global _log_seq
+    while True:
+        # Block for one entry, then take whatever else is already queued so a burst of
+        # scraper output is appended under one lock acquisition instead of one per line
+        batch = [_LOG_QUEUE.get()]
+        try:
+            while len(batch) < MAX_LOG_BATCH:
+                batch.append(_LOG_QUEUE.get_nowait())
+        except queue.Empty:
+            pass
+        # Stamped here rather than by the producers so _LOG_TS stays sorted (see get_log_entries)
+        timestamp = datetime.now().isoformat()
+        with _LOG_LOCK:
+            first_seq = _log_seq + 1
+            for message, type in batch:
+                _LOG_TS.append(timestamp)
+                _LOG_MSG.append(message)
+                _LOG_TYPE.append(type)
+            _log_seq += len(batch)
+        # Print to server console as well (stdout encoding is made safe at startup), one write per batch
+        sys.stdout.write("".join(f"[{timestamp}] [{type.upper()}] {message}\n" for message, type in batch))
+        for seq, (message, type) in enumerate(batch, first_seq):
+            _publish(_LOG_SUBSCRIBERS, "log", (seq, timestamp, message, type))
+
+threading.Thread(target=_log_writer, name="log-writer", daemon=True).start()
+
+def _status_changed():
+    """Call after changing STATUSES/all_scrapers_status: drops the cached /api/status-all and
+    /api/enrichment-stats bodies and pushes the new snapshot to /api/events clients
+    
+    Every status transition must go through here - both endpoints serve their cached body until then
+    (enrichment-stats carries is_running, and its counts move when an enrichment run finishes).
+    """
+    get_all_status.invalidate()
+    get_enrichment_stats.invalidate()
+    if _STATUS_SUBSCRIBERS:
+        _publish(_STATUS_SUBSCRIBERS, "status", _status_event())
+
+def get_log_entries(since=None, since_seq=None):
+    """Snapshot the log buffer as a list of { "seq", "timestamp", "message", "type" } dicts (oldest first)
+    
+    If since_seq is given, only entries with a larger seq are returned; otherwise if since
+    (an ISO timestamp) is given, only entries logged after it.
+    """
+    with _LOG_LOCK:
+        first_seq = _log_seq - len(_LOG_TS) + 1
+        if since_seq is not None:
+            # Sequence numbers are consecutive, so the cutoff is plain arithmetic
+            start = min(max(since_seq + 1 - first_seq, 0), len(_LOG_TS))
+        elif since:
+            # Timestamps are appended in order and ISO strings sort chronologically,
+            # so the cutoff is a binary search instead of a scan
+            start = bisect.bisect_right(_LOG_TS, since)
+        else:
+            start = 0
+        rows = list(zip(islice(_LOG_TS, start, None), islice(_LOG_MSG, start, None), islice(_LOG_TYPE, start, None)))
+    return [
+        {"seq": seq, "timestamp": ts, "message": msg, "type": ty}
+        for seq, (ts, msg, ty) in enumerate(rows, first_seq + start)
+    ]
+
+# Child processes are run on one asyncio event loop in a background thread: it tails every
+# scraper's stdout concurrently, so there is no dedicated reader thread per scraper.
+_PROCESS_LOOP = asyncio.new_event_loop()
+threading.Thread(target=_PROCESS_LOOP.run_forever, name="process-loop", daemon=True).start()
+
+# Children write their console encoding, which is what text-mode Popen used to decode with
+_PIPE_ENCODING = locale.getpreferredencoding(False)
+MAX_OUTPUT_LINE = 1024 * 1024
+OUTPUT_CHUNK_SIZE = 64 * 1024
+
+# Each scraper leads its own process group so a stop can signal everything it spawned
+if os.name == "posix":
+    _NEW_PROCESS_GROUP = {"start_new_session": True}
+    _GROUP_SIGNALS = {"terminate": signal.SIGTERM, "kill": signal.SIGKILL}
+else:
+    _NEW_PROCESS_GROUP = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+
+async def stream_output(process, scraper_name):
     """Read output from process and add to logs"""
-    for line in iter(process.stdout.readline, ''):
-        if line:
-            add_log(f"[{scraper_name}] {line.strip()}", "info")
-        # Check if process was stopped
-        if scraper_name in user_stopped_processes:
+    prefix = f"[{scraper_name}] "
+    # Read whatever is available (up to 64 KiB) and split lines ourselves: one await per
+    # chunk instead of one per line for chatty Scrapy output
+    tail = b""
+    while True:
+        chunk = await process.stdout.read(OUTPUT_CHUNK_SIZE)
+        if not chunk:
             break
-    try:
-        process.stdout.close()
-    except:
-        pass
+        *lines, tail = (tail + chunk).split(b"\n")
+        for line in lines:
+            add_log(prefix + line.decode(_PIPE_ENCODING, "replace").strip(), "info")
+        if len(tail) > MAX_OUTPUT_LINE:
+            tail = b""  # Line longer than MAX_OUTPUT_LINE - drop what we have, keep reading
+    if tail:
+        # Last line without a trailing newline
+        add_log(prefix + tail.decode(_PIPE_ENCODING, "replace").strip(), "info")
 
-def run_process_with_logging(cmd, cwd, scraper_name, status_dict, env=None):
-    """Run a subprocess and stream its output to logs"""
+async def _run_process(cmd, cwd, scraper_name, env=None):
+    """Run a subprocess on the process loop and stream its output to logs"""
+    status_dict = STATUSES[scraper_name]
     try:
         add_log(f"Starting {scraper_name}...", "info")
         status_dict["running"] = True
         status_dict["error"] = None
         status_dict["last_run"] = datetime.now().isoformat()
+        _status_changed()
         
-        process = subprocess.Popen(
-            cmd,
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
             cwd=cwd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT, # Merge stderr into stdout for simple logging
-            text=True,
-            bufsize=1, # Line buffered
-            universal_newlines=True,
-            env=env
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT, # Merge stderr into stdout for simple logging
+            env=env,
+            limit=MAX_OUTPUT_LINE,
+            **_NEW_PROCESS_GROUP
         )
         
         # Register process for stopping
         active_processes[scraper_name] = process
+        # Stop All may have landed while this one was starting
+        if _STOP_EVENT.is_set() and scraper_name == all_scrapers_status.get("current_scraper"):
+            _signal_process(process, "terminate")
         
-        # Read output in real-time (non-blocking thread)
-        output_thread = threading.Thread(target=stream_output, args=(process, scraper_name), daemon=True)
-        output_thread.start()
+        reader = asyncio.ensure_future(stream_output(process, scraper_name))
+        # Not process.wait(): that also waits for stdout to close, which a grandchild (e.g. chromedriver)
+        # can hold open long after the scraper itself has exited
+        while process.returncode is None:
+            await asyncio.sleep(0.2)
+        returncode = process.returncode
         
-        # Wait for completion with periodic checks for stop requests
-        returncode = None
-        while returncode is None:
-            returncode = process.poll()
-            if returncode is None:
-                # Process still running - check if user requested stop
-                if scraper_name in user_stopped_processes or (stop_all_requested and scraper_name == all_scrapers_status.get("current_scraper")):
-                    ensure_process_killed(scraper_name)
-                    # Wait briefly for process to terminate
-                    for _ in range(10):  # Check 10 times with 0.2s delay = 2s max wait
-                        returncode = process.poll()
-                        if returncode is not None:
-                            break
-                        time.sleep(0.2)
-                    # Force kill if still running
-                    if returncode is None and process.poll() is None:
-                        try:
-                            process.kill()
-                            time.sleep(0.2)
-                            returncode = process.poll()
-                        except:
-                            pass
-                    break
-                time.sleep(0.5)  # Check every 0.5 seconds instead of blocking
-        
-        # Ensure output thread has time to finish reading
-        output_thread.join(timeout=1.0)
+        # Let the reader drain what is left; a grandchild can keep the pipe open after the scraper exits
+        try:
+            await asyncio.wait_for(reader, timeout=1.0)
+        except asyncio.TimeoutError:
+            pass
         
         # Unregister
         if scraper_name in active_processes:
@@ -180,18 +476,44 @@ def run_process_with_logging(cmd, cwd, scraper_name, status_dict, env=None):
             status_dict["error"] = msg
         
         status_dict["last_result"] = result_info
+        _status_changed()
             
         return success
         
     except Exception as e:
         status_dict["running"] = False
-        ensure_process_killed(scraper_name)
+        process = active_processes.pop(scraper_name, None)
+        if process:
+            _signal_process(process, "kill")
         err_msg = f"Error running {scraper_name}: {str(e)}"
         add_log(err_msg, "error")
         status_dict["error"] = err_msg
         status_dict["last_result"] = {"success": False, "error": str(e)}
+        _status_changed()
         return False
 
+def start_process(cmd, cwd, scraper_name, env=None):
+    """Start a subprocess with logging in the background; returns a concurrent.futures.Future of its success"""
+    return asyncio.run_coroutine_threadsafe(_run_process(cmd, cwd, scraper_name, env), _PROCESS_LOOP)
+
+def run_process_with_logging(cmd, cwd, scraper_name, env=None):
+    """Run a subprocess and stream its output to logs; blocks until it exits and returns True on success"""
+    return start_process(cmd, cwd, scraper_name, env).result()
+
+def _signal_process(process, method):
+    """Call process.terminate()/kill(), ignoring a process that has already exited (process loop only)
+
+    On POSIX the signal goes to the scraper's whole process group, so the browsers and
+    workers it spawned go down with it instead of outliving the parent.
+    """
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, _GROUP_SIGNALS[method])
+        else:
+            getattr(process, method)()
+    except ProcessLookupError:
+        pass
+
 def ensure_process_killed(scraper_name):
     """Kill process if it exists in active_processes"""
     process = active_processes.get(scraper_name)
@@ -199,12 +521,13 @@ def ensure_process_killed(scraper_name):
         # Mark as user-stopped so we don't log the termination as an error
         user_stopped_processes.add(scraper_name)
         try:
-            process.terminate()
+            # asyncio processes belong to the process loop, so signal them from there
+            _PROCESS_LOOP.call_soon_threadsafe(_signal_process, process, "terminate")
             # Wait shorter time (0.3s) before force kill
             time.sleep(0.3)
-            if process.poll() is None:
+            if process.returncode is None:
                 # Process didn't terminate, force kill
-                process.kill()
+                _PROCESS_LOOP.call_soon_threadsafe(_signal_process, process, "kill")
                 time.sleep(0.2)
         except Exception as e:
             add_log(f"Error terminating {scraper_name}: {str(e)}", "error")
@@ -214,41 +537,45 @@ def ensure_process_killed(scraper_name):
 
 def run_sequential_scrapers():
     """Run all scrapers sequentially"""
-    global stop_all_requested, all_scrapers_status
-    
-    if all_scrapers_status["running"]:
+    # Cheap lock-free check first, then claim the run under the lock so two triggers can't both start one
+    claimed = False
+    if not _ALL_RUNNING.is_set():
+        with _STATUS_LOCK:
+            if not _ALL_RUNNING.is_set():
+                _ALL_RUNNING.set()
+                claimed = True
+    if not claimed:
         add_log("⚠️ Sequential run triggered but already running. Skipping.", "warning")
         return
+    
+    try:
+        _run_scrapers_in_sequence()
+    finally:
+        _ALL_RUNNING.clear()
 
-    stop_all_requested = False
+def _run_scrapers_in_sequence():
+    global all_scrapers_status
+    
+    _STOP_EVENT.clear()
     all_scrapers_status["running"] = True
     all_scrapers_status["error"] = None
     all_scrapers_status["last_run"] = datetime.now().isoformat()
+    _status_changed()
     add_log("🚀 Starting ALL scrapers sequentially...", "info")
     
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    
-    scrapers = [
-        ("FSBO", [sys.executable, "forsalebyowner_selenium_scraper.py"], os.path.join(base_dir, "FSBO_Scraper"), scraper_status),
-        ("Apartments", [sys.executable, "-m", "scrapy", "crawl", "apartments_frbo"], os.path.join(base_dir, "Apartments_Scraper"), apartments_scraper_status),
-        ("Zillow_FSBO", [sys.executable, "-m", "scrapy", "crawl", "zillow_spider"], os.path.join(base_dir, "Zillow_FSBO_Scraper"), zillow_fsbo_status),
-        ("Zillow_FRBO", [sys.executable, "-m", "scrapy", "crawl", "zillow_spider"], os.path.join(base_dir, "Zillow_FRBO_Scraper"), zillow_frbo_status),
-        ("Hotpads", [sys.executable, "-m", "scrapy", "crawl", "hotpads_scraper"], os.path.join(base_dir, "Hotpads_Scraper"), hotpads_status),
-        ("Redfin", [sys.executable, "-m", "scrapy", "crawl", "redfin_spider"], os.path.join(base_dir, "Redfin_Scraper"), redfin_status),
-        ("Trulia", [sys.executable, "-m", "scrapy", "crawl", "trulia_spider"], os.path.join(base_dir, "Trulia_Scraper"), trulia_status),
-    ]
-    
-    for name, cmd, cwd, status_dict in scrapers:
-        if stop_all_requested:
+    for scraper in SCRAPERS.values():
+        name = scraper["name"]
+        if _STOP_EVENT.is_set():
             add_log("🛑 Stop All requested. Cancelling remaining scrapers.", "warning")
             break
             
         all_scrapers_status["current_scraper"] = name
+        _status_changed()
         add_log(f"--- Queue: Starting {name} ---", "info")
         
         # Run the scraper
         try:
-            success = run_process_with_logging(cmd, cwd, name, status_dict)
+            success = run_process_with_logging(scraper["cmd"], scraper["dir"], name)
             
             if not success:
                 add_log(f"⚠️ {name} failed, but continuing with next scraper...", "error")
@@ -257,40 +584,42 @@ def run_sequential_scrapers():
         except Exception as e:
              add_log(f"❌ Critical error executing {name}: {e}. Continuing...", "error")
         
-        if stop_all_requested:
+        if _STOP_EVENT.is_set():
             add_log("🛑 Stop All requested. Cancelling remaining scrapers.", "warning")
             break
             
-        time.sleep(2) # Brief pause between scrapers
+        _STOP_EVENT.wait(2) # Brief pause between scrapers (returns early on Stop All)
         
     all_scrapers_status["running"] = False
     all_scrapers_status["current_scraper"] = None
     all_scrapers_status["finished_at"] = datetime.now().isoformat()
-    if stop_all_requested:
+    _status_changed()
+    if _STOP_EVENT.is_set():
             add_log("⏹️ Sequential run stopped by user.", "warning")
     else:
             add_log("🎉 ALL scrapers finished execution.", "success")
 
-def scheduler_loop():
-    """Background loop to check schedule"""
-    while True:
-        schedule.run_pending()
-        time.sleep(60)
+def _schedule_next_run():
+    """Arm a one-shot timer for the next local midnight"""
+    now = datetime.now()
+    target = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    if target - now < timedelta(minutes=1):
+        # Timer fired a moment before midnight - don't schedule a second run for the same night
+        target += timedelta(days=1)
+    timer = threading.Timer((target - now).total_seconds(), _midnight_job)
+    timer.daemon = True
+    timer.start()
+
+def _midnight_job():
+    _schedule_next_run()
+    EXECUTOR.submit(run_sequential_scrapers)
 
 def start_scheduler():
-    """Start the scheduler thread"""
-    # Schedule job every 24 hours (midnight)
-    # You can change this to specific time: schedule.every().day.at("00:00").do(run_sequential_job_thread)
-    # For now, let's stick to simple "every 24 hours" from start, or explicit time.
-    # User asked for "after 24 hours". Let's use 24 hours interval or daily at midnight.
-    # Daily at midnight is more robust.
-    
-    schedule.every().day.at("00:00").do(lambda: threading.Thread(target=run_sequential_scrapers, daemon=True).start())
+    """Run all scrapers daily at midnight"""
+    # One timer per day, re-armed from the wall clock each time, instead of waking up every minute to poll
+    _schedule_next_run()
     
     add_log("⏰ Scheduler started: Will run all scrapers daily at 00:00", "info")
-    
-    t = threading.Thread(target=scheduler_loop, daemon=True)
-    t.start()
 
 # ==================================
 # API ROUTES
@@ -301,13 +630,13 @@ def start_scheduler():
 def health_check():
     """Health check endpoint"""
     if request.method == 'OPTIONS':
-        response = jsonify({})
+        response = _json({})
         response.headers.add('Access-Control-Allow-Origin', '*')
         response.headers.add('Access-Control-Allow-Headers', 'Content-Type')
         response.headers.add('Access-Control-Allow-Methods', 'GET, OPTIONS')
         return response
     
-    response = jsonify({
+    response = _json({
         "status": "healthy",
         "service": "ForSaleByOwner Scraper API",
         "timestamp": datetime.now().isoformat()
@@ -316,204 +645,59 @@ def health_check():
     return response
 
 
-@app.route('/api/trigger', methods=['POST', 'GET'])
-def trigger_scraper():
-    """Trigger FSBO scraper"""
-    if scraper_status["running"]:
-        return jsonify({"error": "FSBO Scraper is already running"}), 400
-    
-    def worker():
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        scraper_dir = os.path.join(base_dir, "FSBO_Scraper")
-        run_process_with_logging(
-            [sys.executable, "forsalebyowner_selenium_scraper.py"],
-            scraper_dir,
-            "FSBO",
-            scraper_status
-        )
-    
-    thread = threading.Thread(target=worker)
-    thread.daemon = True
-    thread.start()
-    
-    return jsonify({"message": "FSBO scraper started"})
-
-@app.route('/api/trigger-apartments', methods=['POST', 'GET'])
-def trigger_apartments():
-    if apartments_scraper_status["running"]:
-        return jsonify({"error": "Apartments Scraper is already running"}), 400
-    
-    city = request.args.get("city", "chicago-il")
-    
-    def worker():
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        scraper_dir = os.path.join(base_dir, "Apartments_Scraper")
-        run_process_with_logging(
-             [sys.executable, "-m", "scrapy", "crawl", "apartments_frbo", "-a", f"city={city}"],
-             scraper_dir,
-             "Apartments",
-             apartments_scraper_status
-        )
-
-    thread = threading.Thread(target=worker)
-    thread.daemon = True
-    thread.start()
-    
-    return jsonify({"message": "Apartments scraper started"})
+def _trigger(scraper_id):
+    """Start one scraper in the background (shared by all /api/trigger-* routes)"""
+    scraper = SCRAPERS[scraper_id]
+    name, label = scraper["name"], scraper["label"]
+    if not _claim_process(name):
+        return _json({"error": f"{label} Scraper is already running"}, 400)
+    
+    cmd = list(scraper["cmd"])
+    for param, spider_arg, default in scraper["args"]:
+        value = request.args.get(param, default)
+        if value:
+            cmd.extend(["-a", f"{spider_arg}={value}"])
+    
+    start_process(cmd, scraper["dir"], name)
+    
+    return _json({"message": f"{label} scraper started"})
 
-@app.route('/api/status-apartments', methods=['GET'])
-def get_apartments_status():
-    return jsonify({
-        "status": "running" if apartments_scraper_status["running"] else "idle",
-        "last_run": apartments_scraper_status["last_run"],
-        "error": apartments_scraper_status["error"]
+def _status(name):
+    """Status of one scraper or enrichment by internal name (shared by all /api/status-* routes)"""
+    status_dict = STATUSES[name]
+    return _json({
+        "status": "running" if status_dict["running"] else "idle",
+        "last_run": status_dict["last_run"],
+        "error": status_dict["error"]
     })
 
-@app.route('/api/trigger-zillow-fsbo', methods=['POST', 'GET'])
-def trigger_zillow_fsbo():
-    if zillow_fsbo_status["running"]:
-         return jsonify({"error": "Zillow FSBO Scraper is already running"}), 400
-         
-    url = request.args.get("url")
-    cmd = [sys.executable, "-m", "scrapy", "crawl", "zillow_spider"]
-    if url:
-        cmd.extend(["-a", f"start_url={url}"])
-        
-    def worker():
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        scraper_dir = os.path.join(base_dir, "Zillow_FSBO_Scraper")
-        run_process_with_logging(cmd, scraper_dir, "Zillow_FSBO", zillow_fsbo_status)
-        
-    thread = threading.Thread(target=worker)
-    thread.daemon = True
-    thread.start()
-    
-    return jsonify({"message": "Zillow FSBO scraper started"})
-
-@app.route('/api/status-zillow-fsbo', methods=['GET'])
-def get_zillow_fsbo_status():
-    return jsonify({
-        "status": "running" if zillow_fsbo_status["running"] else "idle",
-        "last_run": zillow_fsbo_status["last_run"],
-        "error": zillow_fsbo_status["error"]
-    })
+for _scraper_id, _scraper in SCRAPERS.items():
+    app.add_url_rule(_scraper["trigger"], f"trigger_{_scraper_id}",
+                     functools.partial(_trigger, _scraper_id), methods=['POST', 'GET'])
+    if _scraper["status"]:
+        app.add_url_rule(_scraper["status"], f"status_{_scraper_id}",
+                         functools.partial(_status, _scraper["name"]), methods=['GET'])
+del _scraper_id, _scraper
 
-@app.route('/api/trigger-zillow-frbo', methods=['POST', 'GET'])
-def trigger_zillow_frbo():
-    if zillow_frbo_status["running"]:
-         return jsonify({"error": "Zillow FRBO Scraper is already running"}), 400
-         
-    url = request.args.get("url")
-    cmd = [sys.executable, "-m", "scrapy", "crawl", "zillow_spider"]
-    if url:
-        cmd.extend(["-a", f"start_url={url}"])
-        
-    def worker():
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        scraper_dir = os.path.join(base_dir, "Zillow_FRBO_Scraper")
-        run_process_with_logging(cmd, scraper_dir, "Zillow_FRBO", zillow_frbo_status)
-        
-    thread = threading.Thread(target=worker)
-    thread.daemon = True
-    thread.start()
-    
-    return jsonify({"message": "Zillow FRBO scraper started"})
-
-@app.route('/api/status-zillow-frbo', methods=['GET'])
-def get_zillow_frbo_status():
-    return jsonify({
-        "status": "running" if zillow_frbo_status["running"] else "idle",
-        "last_run": zillow_frbo_status["last_run"],
-        "error": zillow_frbo_status["error"]
-    })
+# Parameterised routes for every scraper by registry id (the per-scraper URLs above remain
+# for existing clients): two rules plus a dict lookup instead of one rule per scraper
+scrapers_bp = Blueprint('scrapers', __name__, url_prefix='/api')
 
-@app.route('/api/trigger-hotpads', methods=['POST', 'GET'])
-def trigger_hotpads():
-    if hotpads_status["running"]:
-        return jsonify({"error": "Hotpads Scraper is already running"}), 400
-        
-    def worker():
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        scraper_dir = os.path.join(base_dir, "Hotpads_Scraper")
-        add_log("Manual trigger for Hotpads received from API", "info")
-        run_process_with_logging(
-            [sys.executable, "-m", "scrapy", "crawl", "hotpads_scraper"], 
-            scraper_dir, 
-            "Hotpads", 
-            hotpads_status
-        )
-        
-    thread = threading.Thread(target=worker)
-    thread.daemon = True
-    thread.start()
-    
-    return jsonify({"message": "Hotpads scraper started"})
-
-@app.route('/api/status-hotpads', methods=['GET'])
-def get_hotpads_status():
-    return jsonify({
-        "status": "running" if hotpads_status["running"] else "idle",
-        "last_run": hotpads_status["last_run"],
-        "error": hotpads_status["error"]
-    })
+@scrapers_bp.route('/trigger/<scraper_id>', methods=['POST', 'GET'])
+def trigger_scraper(scraper_id):
+    """Start a scraper by its registry id, e.g. /api/trigger/zillow_fsbo"""
+    if scraper_id not in SCRAPERS:
+        return _json({"error": f"Unknown scraper: {scraper_id}"}, 404)
+    return _trigger(scraper_id)
 
-@app.route('/api/trigger-redfin', methods=['POST', 'GET'])
-def trigger_redfin():
-    if redfin_status["running"]:
-        return jsonify({"error": "Redfin Scraper is already running"}), 400
-        
-    def worker():
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        scraper_dir = os.path.join(base_dir, "Redfin_Scraper")
-        run_process_with_logging(
-            [sys.executable, "-m", "scrapy", "crawl", "redfin_spider"], 
-            scraper_dir, 
-            "Redfin", 
-            redfin_status
-        )
-        
-    thread = threading.Thread(target=worker)
-    thread.daemon = True
-    thread.start()
-    
-    return jsonify({"message": "Redfin scraper started"})
-
-@app.route('/api/status-redfin', methods=['GET'])
-def get_redfin_status():
-    return jsonify({
-        "status": "running" if redfin_status["running"] else "idle",
-        "last_run": redfin_status["last_run"],
-        "error": redfin_status["error"]
-    })
+@scrapers_bp.route('/status/<scraper_id>', methods=['GET'])
+def scraper_status(scraper_id):
+    """Status of a scraper by its registry id, e.g. /api/status/zillow_fsbo"""
+    if scraper_id not in SCRAPERS:
+        return _json({"error": f"Unknown scraper: {scraper_id}"}, 404)
+    return _status(SCRAPERS[scraper_id]["name"])
 
-@app.route('/api/trigger-trulia', methods=['POST', 'GET'])
-def trigger_trulia():
-    if trulia_status["running"]:
-        return jsonify({"error": "Trulia Scraper is already running"}), 400
-        
-    def worker():
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        scraper_dir = os.path.join(base_dir, "Trulia_Scraper")
-        run_process_with_logging(
-            [sys.executable, "-m", "scrapy", "crawl", "trulia_spider"], 
-            scraper_dir, 
-            "Trulia", 
-            trulia_status
-        )
-        
-    thread = threading.Thread(target=worker)
-    thread.daemon = True
-    thread.start()
-    
-    return jsonify({"message": "Trulia scraper started"})
-
-@app.route('/api/status-trulia', methods=['GET'])
-def get_trulia_status():
-    return jsonify({
-        "status": "running" if trulia_status["running"] else "idle",
-        "last_run": trulia_status["last_run"],
-        "error": trulia_status["error"]
-    })
+app.register_blueprint(scrapers_bp)
 
 @app.route('/api/test-search', methods=['GET'])
 def test_search():
@@ -523,7 +707,7 @@ def test_search():
     print("=" * 80)
     import sys
     sys.stdout.flush()
-    return jsonify({"status": "ok", "message": "Test endpoint working", "timestamp": datetime.now().isoformat()})
+    return _json({"status": "ok", "message": "Test endpoint working", "timestamp": datetime.now().isoformat()})
 
 @app.route('/api/search-location', methods=['POST', 'GET', 'OPTIONS'])
 def search_location():
@@ -539,7 +723,7 @@ def search_location():
     # Handle CORS preflight - MUST be first thing we do
     if request.method == 'OPTIONS':
         add_log("SEARCH-LOCATION: Handling OPTIONS preflight", "info")
-        response = jsonify({})
+        response = _json({})
         response.headers.add('Access-Control-Allow-Origin', '*')
         response.headers.add('Access-Control-Allow-Headers', 'Content-Type')
         response.headers.add('Access-Control-Allow-Methods', 'POST, GET, OPTIONS')
@@ -556,7 +740,7 @@ def search_location():
         except Exception as import_error:
             error_msg = f"Failed to import LocationSearcher: {str(import_error)}"
             add_log(error_msg, "error")
-            response = jsonify({
+            response = _json({
                 "error": error_msg,
                 "error_type": "import_error"
             })
@@ -583,17 +767,17 @@ def search_location():
             sys.stdout.flush()
         except Exception as e:
             add_log(f"Error parsing request: {e}", "error")
-            response = jsonify({"error": "Invalid request format"})
+            response = _json({"error": "Invalid request format"})
             response.headers.add('Access-Control-Allow-Origin', '*')
             return response, 400
         
         if not platform:
-            response = jsonify({"error": "Platform parameter is required"})
+            response = _json({"error": "Platform parameter is required"})
             response.headers.add('Access-Control-Allow-Origin', '*')
             return response, 400
         
         if not location:
-            response = jsonify({"error": "Location parameter is required"})
+            response = _json({"error": "Location parameter is required"})
             response.headers.add('Access-Control-Allow-Origin', '*')
             return response, 400
         
@@ -627,7 +811,7 @@ def search_location():
             if search_thread.is_alive():
                 # Thread is still running - it timed out
                 add_log(f"Location search timed out after 90 seconds for {platform}/{location}", "error")
-                response = jsonify({
+                response = _json({
                     "error": "Location search timed out. The operation took too long. Please try again or use Browserless.io for better performance.",
                     "platform": platform,
                     "location": location,
@@ -642,7 +826,7 @@ def search_location():
                 add_log(f"Selenium error during location search: {error_msg}", "error")
                 add_log(f"Selenium traceback: {traceback.format_exc()}", "error")
                 
-                response = jsonify({
+                response = _json({
                     "error": f"Browser automation failed: {error_msg}. Please ensure Chrome/Chromium is available on the server or set BROWSERLESS_TOKEN.",
                     "platform": platform,
                     "location": location,
@@ -653,7 +837,7 @@ def search_location():
             
             if not url:
                 add_log(f"Could not find URL for {platform}/{location}", "warning")
-                response = jsonify({
+                response = _json({
                     "error": f"Could not find listing URL for '{location}' on {platform}",
                     "platform": platform,
                     "location": location
@@ -666,7 +850,7 @@ def search_location():
             detected_platform, extracted_location = URLDetector.detect_and_extract(url)
             
             add_log(f"Location search successful: {platform}/{location} -> {url}", "success")
-            response = jsonify({
+            response = _json({
                 "url": url,
                 "platform": detected_platform or platform,
                 "location": extracted_location,
@@ -679,7 +863,7 @@ def search_location():
             error_trace = traceback.format_exc()
             add_log(f"Error in location search: {inner_error}", "error")
             add_log(f"Traceback: {error_trace}", "error")
-            response = jsonify({
+            response = _json({
                 "error": f"Error searching location: {str(inner_error)}",
                 "platform": platform if 'platform' in locals() else None,
                 "location": location if 'location' in locals() else None
@@ -697,7 +881,7 @@ def search_location():
             platform_val = platform if 'platform' in locals() else None
             location_val = location if 'location' in locals() else None
             
-            response = jsonify({
+            response = _json({
                 "error": f"Unexpected error: {str(outer_error)}",
                 "platform": platform_val,
                 "location": location_val,
@@ -708,7 +892,7 @@ def search_location():
         except Exception as final_error:
             # Last resort - return minimal response with CORS
             try:
-                response = jsonify({"error": "Internal server error - could not process request"})
+                response = _json({"error": "Internal server error - could not process request"})
                 response.headers.add('Access-Control-Allow-Origin', '*')
                 return response, 500
             except:
@@ -727,44 +911,56 @@ def validate_url():
         expected_platform = request.args.get('expected_platform') or (request.form.get('expected_platform') if request.form else None)
     
     if not url:
-        return jsonify({"error": "URL parameter is required"}), 400
+        return _json({"error": "URL parameter is required"}, 400)
     
-    # Validate URL format
-    if not url.startswith(('http://', 'https://')):
-        return jsonify({
+    # Validate URL format (parsed once here and reused for platform detection)
+    parts = urlsplit(url)
+    if parts.scheme not in ('http', 'https') or not parts.netloc:
+        return _json({
             "error": "Invalid URL format. URL must start with http:// or https://",
             "isValid": False
-        }), 400
+        }, 400)
     
     # Detect platform and route
-    platform, table_name, scraper_config, location = TableRouter.route_url(url)
+    platform, table_name, scraper_config, location = TableRouter.route_url(url, parts)
     
     # Validate against expected platform if provided
     if expected_platform and platform != expected_platform:
-        return jsonify({
+        return _json({
             "platform": platform,
             "table": table_name,
             "location": location,
             "isValid": False,
             "error": f"URL is for {platform or 'unknown platform'}, but expected {expected_platform}"
-        }), 400
+        }, 400)
     
     if not platform or not table_name:
-        return jsonify({
+        return _json({
             "platform": None,
             "table": None,
             "location": location,
             "isValid": False,
             "error": "Unknown or unsupported platform"
-        }), 400
+        }, 400)
     
-    return jsonify({
+    return _json({
         "platform": platform,
         "table": table_name,
         "location": location,
         "isValid": True
     })
 
+# Map platform to scraper name for logging and status tracking (use capitalized names for consistency)
+PLATFORM_SCRAPER_NAMES = {
+    'apartments.com': 'Apartments',
+    'hotpads': 'Hotpads',
+    'redfin': 'Redfin',
+    'trulia': 'Trulia',
+    'zillow_fsbo': 'Zillow_FSBO',
+    'zillow_frbo': 'Zillow_FRBO',
+    'fsbo': 'FSBO'
+}
+
 @app.route('/api/trigger-from-url', methods=['POST', 'GET'])
 def trigger_from_url():
     """Trigger scraper from any URL - automatically detects platform and routes to appropriate scraper."""
@@ -775,80 +971,43 @@ def trigger_from_url():
         url = request.args.get('url') or (request.form.get('url') if request.form else None)
     
     if not url:
-        return jsonify({"error": "URL parameter is required"}), 400
+        return _json({"error": "URL parameter is required"}, 400)
     
-    # Validate URL format
-    if not url.startswith(('http://', 'https://')):
-        return jsonify({"error": "Invalid URL format. URL must start with http:// or https://"}), 400
+    # Validate URL format (parsed once here and reused for platform detection)
+    parts = urlsplit(url)
+    if parts.scheme not in ('http', 'https') or not parts.netloc:
+        return _json({"error": "Invalid URL format. URL must start with http:// or https://"}, 400)
     
     # Detect platform and route
-    platform, table_name, scraper_config, location = TableRouter.route_url(url)
+    platform, table_name, scraper_config, location = TableRouter.route_url(url, parts)
     
     if not platform or not scraper_config:
         # Unknown platform - return error (for now, generic scraper handler can be added later)
-        return jsonify({
+        return _json({
             "error": "Unknown or unsupported platform",
             "url": url,
             "detected_location": location
-        }), 400
-    
-    # Get status dict based on platform
-    status_dict_map = {
-        'apartments.com': apartments_scraper_status,
-        'hotpads': hotpads_status,
-        'redfin': redfin_status,
-        'trulia': trulia_status,
-        'zillow_fsbo': zillow_fsbo_status,
-        'zillow_frbo': zillow_frbo_status,
-        'fsbo': scraper_status,
-    }
+        }, 400)
     
-    status_dict = status_dict_map.get(platform)
-    if not status_dict:
-        return jsonify({"error": f"No status tracking for platform: {platform}"}), 500
+    scraper_name = PLATFORM_SCRAPER_NAMES.get(platform)
+    if not scraper_name:
+        return _json({"error": f"No status tracking for platform: {platform}"}, 500)
     
-    # Check if scraper is already running
-    if status_dict["running"]:
-        return jsonify({
+    # Check if scraper is already running (and claim it if not)
+    if not _claim_process(scraper_name):
+        return _json({
             "error": f"Scraper for {platform} is already running",
             "platform": platform,
             "table": table_name
-        }), 400
-    
-    # Map platform to scraper name for logging (use capitalized names for consistency)
-    scraper_name_map = {
-        'apartments.com': 'Apartments',
-        'hotpads': 'Hotpads',
-        'redfin': 'Redfin',
-        'trulia': 'Trulia',
-        'zillow_fsbo': 'Zillow_FSBO',
-        'zillow_frbo': 'Zillow_FRBO',
-        'fsbo': 'FSBO'
-    }
-    scraper_name = scraper_name_map.get(platform, platform.title())
+        }, 400)
     
     # Build command based on scraper config
-    scraper_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), scraper_config['scraper_dir'])
-    url_param = scraper_config['url_param']
-    
-    if scraper_config['scraper_name'] == 'forsalebyowner_selenium_scraper':
-        # FSBO uses a different command structure - now supports --url argument
-        cmd = [sys.executable, scraper_config['command'][0], '--url', url]
-        env = None
-    else:
-        # Scrapy-based scrapers
-        cmd = [sys.executable] + scraper_config['command'] + [f"{url_param}={url}"]
-        env = None
-    
-    def worker():
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        run_process_with_logging(cmd, scraper_dir, scraper_name, status_dict, env=env)
+    scraper_dir = SCRAPER_DIRS.get(scraper_name) or os.path.join(BASE_DIR, scraper_config['scraper_dir'])
+    cmd = scraper_config['build_cmd'](url)
     
-    thread = threading.Thread(target=worker)
-    thread.daemon = True
-    thread.start()
+    start_process(cmd, scraper_dir, scraper_name, env=scraper_config.get('env'))
     
-    return jsonify({
+    return _json({
         "message": f"Scraper started for {platform}",
         "platform": platform,
         "table": table_name,
@@ -862,97 +1021,198 @@ def trigger_from_url():
 
 @app.route('/api/trigger-all', methods=['POST', 'GET'])
 def trigger_all():
-    global all_scrapers_status
-    if all_scrapers_status["running"]:
-        return jsonify({"error": "All Scrapers job is already running"}), 400
+    if _ALL_RUNNING.is_set():
+        return _json({"error": "All Scrapers job is already running"}, 400)
     
-    # Start the sequential runner in a background thread
-    thread = threading.Thread(target=run_sequential_scrapers)
-    thread.daemon = True
-    thread.start()
+    # Start the sequential runner in the background
+    EXECUTOR.submit(run_sequential_scrapers)
     
-    return jsonify({"message": "Started sequential run of all scrapers"})
+    return _json({"message": "Started sequential run of all scrapers"})
 
-@app.route('/api/status-all', methods=['GET'])
-def get_all_status():
-    return jsonify({
+def _status_snapshot():
+    """Body of /api/status-all"""
+    return {
         "all_scrapers": {
             "running": all_scrapers_status["running"],
             "last_run": all_scrapers_status["last_run"],
             "finished_at": all_scrapers_status["finished_at"],
             "current_scraper": all_scrapers_status["current_scraper"]
         },
-        "fsbo": { "status": "running" if scraper_status["running"] else "idle", "last_run": scraper_status["last_run"], "last_result": scraper_status["last_result"] },
-        "apartments": { "status": "running" if apartments_scraper_status["running"] else "idle", "last_run": apartments_scraper_status["last_run"], "last_result": apartments_scraper_status["last_result"] },
-        "zillow_fsbo": { "status": "running" if zillow_fsbo_status["running"] else "idle", "last_run": zillow_fsbo_status["last_run"], "last_result": zillow_fsbo_status["last_result"] },
-        "zillow_frbo": { "status": "running" if zillow_frbo_status["running"] else "idle", "last_run": zillow_frbo_status["last_run"], "last_result": zillow_frbo_status["last_result"] },
-        "hotpads": { "status": "running" if hotpads_status["running"] else "idle", "last_run": hotpads_status["last_run"], "last_result": hotpads_status["last_result"] },
-        "redfin": { "status": "running" if redfin_status["running"] else "idle", "last_run": redfin_status["last_run"], "last_result": redfin_status["last_result"] },
-        "trulia": { "status": "running" if trulia_status["running"] else "idle", "last_run": trulia_status["last_run"], "last_result": trulia_status["last_result"] },
-    })
+        **{
+            scraper_id: {
+                "status": "running" if STATUSES[name]["running"] else "idle",
+                "last_run": STATUSES[name]["last_run"],
+                "last_result": STATUSES[name]["last_result"]
+            }
+            for scraper_id, name in SCRAPER_IDS.items()
+        }
+    }
+
+def _status_event():
+    """Payload of /api/events "status" events: the /api/status-all snapshot plus enrichment"""
+    enrichment = STATUSES["Enrichment"]
+    return {
+        **_status_snapshot(),
+        "enrichment": {
+            "status": "running" if enrichment["running"] else "idle",
+            "last_run": enrichment["last_run"],
+            "last_result": enrichment["last_result"]
+        }
+    }
+
+@app.route('/api/status-all', methods=['GET'])
+# Invalidated by _status_changed() on every transition, so polls between changes are served from
+# the cached bytes; the TTL is only a backstop
+@ttl_cache(60.0)
+def get_all_status():
+    return _json(_status_snapshot())
+
+def get_log_prefixes(scraper_name):
+    """Message prefixes that identify log lines of a scraper ("[Name] ...")"""
+    # Map platform names to scraper names used in logs
+    scraper_name_map = {
+        'apartments': 'Apartments',
+        'apartments.com': 'Apartments',
+        'hotpads': 'Hotpads',
+        'redfin': 'Redfin',
+        'trulia': 'Trulia',
+        'zillow_fsbo': 'Zillow_FSBO',
+        'zillow_frbo': 'Zillow_FRBO',
+        'fsbo': 'FSBO'
+    }
+    log_scraper_name = scraper_name_map.get(scraper_name, scraper_name)
+    # Only match logs that explicitly start with the scraper name in brackets (strict matching)
+    return (f"[{log_scraper_name}]", f"[{log_scraper_name.lower()}]")
 
 @app.route('/api/logs', methods=['GET'])
 def get_logs():
-    """Get logs from the log buffer, optionally filtered by scraper name"""
+    """Get logs from the log buffer, optionally filtered by scraper name and/or newer than
+    ?since_seq=<seq> (preferred for incremental polling) or ?since=<timestamp>
+    
+    ?format=ndjson streams the entries as newline-delimited JSON instead, oldest first,
+    one object per line (no "total" envelope).
+    
+    ?format=compact returns each entry as a positional [seq, timestamp, level, message] row
+    (most recent first) with the field names given once in "schema" and level as an index
+    into "levels", instead of repeating the keys on every entry.
+    """
     scraper_name = request.args.get('scraper', None)
     limit = request.args.get('limit', type=int)
+    since = request.args.get('since', None)
+    since_seq = request.args.get('since_seq', type=int)
     
     # Get logs from buffer (most recent first)
-    logs = list(LOG_BUFFER)
+    logs = get_log_entries(since, since_seq)
     
     # Filter by scraper name if provided (logs have format "[scraper_name] message" or contain scraper name)
     if scraper_name:
-        # Map platform names to scraper names used in logs
-        scraper_name_map = {
-            'apartments': 'Apartments',
-            'apartments.com': 'Apartments',
-            'hotpads': 'Hotpads',
-            'redfin': 'Redfin',
-            'trulia': 'Trulia',
-            'zillow_fsbo': 'Zillow_FSBO',
-            'zillow_frbo': 'Zillow_FRBO',
-            'fsbo': 'FSBO'
-        }
-        log_scraper_name = scraper_name_map.get(scraper_name, scraper_name)
-        # Filter logs that start with [scraper_name] (strict matching)
-        # Only match logs that explicitly start with the scraper name in brackets
-        logs = [
-            log for log in logs 
-            if log["message"].startswith(f"[{log_scraper_name}]")
-            or log["message"].startswith(f"[{log_scraper_name.lower()}]")
-        ]
+        prefixes = get_log_prefixes(scraper_name)
+        logs = [log for log in logs if log["message"].startswith(prefixes)]
     
     # Limit number of logs if specified (most recent)
     # Note: Reverse the list first to get most recent logs, then take limit from the end
     if limit and limit > 0:
         logs = logs[-limit:] if len(logs) > limit else logs
     
+    if request.args.get('format') == 'ndjson':
+        # Written out entry by entry instead of building one JSON document for the whole reply
+        def generate():
+            for log in logs:
+                yield orjson.dumps(log, option=orjson.OPT_APPEND_NEWLINE)
+        return Response(generate(), mimetype='application/x-ndjson')
+    
     # Reverse to show most recent first (newest at the end of the list)
     logs.reverse()
     
-    return jsonify({
+    if request.args.get('format') == 'compact':
+        return _json({
+            "schema": ["seq", "t", "l", "m"],
+            "levels": LOG_LEVELS,
+            "rows": [
+                [log["seq"], log["timestamp"], _LOG_LEVEL_CODES.get(log["type"], log["type"]), log["message"]]
+                for log in logs
+            ],
+            "total": len(logs)
+        })
+    
+    return _json({
         "logs": logs,
         "total": len(logs)
     })
 
+@app.route('/api/logs/stream', methods=['GET'])
+def stream_logs():
+    """Server-Sent Events stream of new log entries, optionally filtered by scraper name"""
+    release = _claim_stream_slot()
+    if release is None:
+        return _streams_full()
+    
+    scraper_name = request.args.get('scraper', None)
+    prefixes = get_log_prefixes(scraper_name) if scraper_name else None
+    
+    subscriber = queue.Queue(maxsize=MAX_SUBSCRIBER_QUEUE)
+    
+    def generate():
+        # Registered on first read so a client that disconnects before then leaves nothing behind
+        _LOG_SUBSCRIBERS.add(subscriber)
+        try:
+            while True:
+                try:
+                    _, (seq, timestamp, message, type) = subscriber.get(timeout=15)
+                except queue.Empty:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield b": keepalive\n\n"
+                    continue
+                if prefixes and not message.startswith(prefixes):
+                    continue
+                entry = {"seq": seq, "timestamp": timestamp, "message": message, "type": type}
+                yield b"data: " + orjson.dumps(entry) + b"\n\n"
+        finally:
+            _LOG_SUBSCRIBERS.discard(subscriber)
+    
+    return _stream_response(generate, release)
+
+@app.route('/api/events', methods=['GET'])
+def stream_events():
+    """Server-Sent Events stream for dashboards: "status" events (the /api/status-all snapshot plus
+    enrichment, sent on connect and on every change) and "log" events (new log entries)"""
+    release = _claim_stream_slot()
+    if release is None:
+        return _streams_full()
+    
+    subscriber = queue.Queue(maxsize=MAX_SUBSCRIBER_QUEUE)
+    
+    def generate():
+        _STATUS_SUBSCRIBERS.add(subscriber)
+        _LOG_SUBSCRIBERS.add(subscriber)
+        try:
+            yield b"event: status\ndata: " + orjson.dumps(_status_event()) + b"\n\n"
+            while True:
+                try:
+                    event, payload = subscriber.get(timeout=15)
+                except queue.Empty:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield b": keepalive\n\n"
+                    continue
+                if event == "log":
+                    seq, timestamp, message, type = payload
+                    payload = {"seq": seq, "timestamp": timestamp, "message": message, "type": type}
+                yield b"event: " + event.encode() + b"\ndata: " + orjson.dumps(payload) + b"\n\n"
+        finally:
+            _STATUS_SUBSCRIBERS.discard(subscriber)
+            _LOG_SUBSCRIBERS.discard(subscriber)
+    
+    return _stream_response(generate, release)
+
 @app.route('/api/stop-scraper', methods=['GET', 'POST'])
 def stop_scraper():
     id = request.args.get('id')
     if not id:
-        return jsonify({"error": "Missing id"}), 400
-    
-    # Map friendly IDs to internal names
-    id_map = {
-        "fsbo": "FSBO",
-        "apartments": "Apartments",
-        "zillow_fsbo": "Zillow_FSBO",
-        "zillow_frbo": "Zillow_FRBO",
-        "hotpads": "Hotpads",
-        "redfin": "Redfin",
-        "trulia": "Trulia"
-    }
+        return _json({"error": "Missing id"}, 400)
     
-    internal_name = id_map.get(id, id)
+    # Map friendly IDs to internal names (other IDs, e.g. "Enrichment", are used as-is)
+    scraper = SCRAPERS.get(id)
+    internal_name = scraper["name"] if scraper else id
     process_found = False
     
     if internal_name in active_processes:
@@ -962,43 +1222,29 @@ def stop_scraper():
     
     # Reset status dictionaries even if process handle was missing
     status_updated = False
-    if id == "fsbo":
-        if scraper_status["running"]: status_updated = True
-        scraper_status["running"] = False
-    elif id == "apartments":
-        if apartments_scraper_status["running"]: status_updated = True
-        apartments_scraper_status["running"] = False
-    elif id == "zillow_fsbo":
-        if zillow_fsbo_status["running"]: status_updated = True
-        zillow_fsbo_status["running"] = False
-    elif id == "zillow_frbo":
-        if zillow_frbo_status["running"]: status_updated = True
-        zillow_frbo_status["running"] = False
-    elif id == "hotpads":
-        if hotpads_status["running"]: status_updated = True
-        hotpads_status["running"] = False
-    elif id == "redfin":
-        if redfin_status["running"]: status_updated = True
-        redfin_status["running"] = False
-    elif id == "trulia":
-        if trulia_status["running"]: status_updated = True
-        trulia_status["running"] = False
-        
+    if scraper:
+        status_dict = STATUSES[internal_name]
+        with _STATUS_LOCK:
+            status_updated = status_dict["running"]
+            status_dict["running"] = False
+        _status_changed()
+    
+
     if process_found:
-        return jsonify({"message": f"Stopped {internal_name}"}), 200
+        return _json({"message": f"Stopped {internal_name}"})
     elif status_updated:
         add_log(f"Reset {internal_name} status (no active process handle found)", "info")
-        return jsonify({"message": f"Reset {internal_name} status"}), 200
+        return _json({"message": f"Reset {internal_name} status"})
     
-    return jsonify({"error": "Scraper not running"}), 404
+    return _json({"error": "Scraper not running"}, 404)
 
 @app.route('/api/stop-all', methods=['GET', 'POST'])
 def stop_all():
-    global stop_all_requested, all_scrapers_status
+    global all_scrapers_status
     if not all_scrapers_status["running"]:
-        return jsonify({"error": "No sequential run active"}), 400
+        return _json({"error": "No sequential run active"}, 400)
     
-    stop_all_requested = True
+    _STOP_EVENT.set()
     add_log("🛑 User requested to stop ALL scrapers.", "warning")
     
     # Immediately update all_scrapers_status to reflect stop
@@ -1013,21 +1259,17 @@ def stop_all():
             stopped_count += 1
     
     # Also update status for all scrapers immediately
-    scraper_status["running"] = False
-    apartments_scraper_status["running"] = False
-    zillow_fsbo_status["running"] = False
-    zillow_frbo_status["running"] = False
-    hotpads_status["running"] = False
-    redfin_status["running"] = False
-    trulia_status["running"] = False
+    for name in SCRAPER_IDS.values():
+        STATUSES[name]["running"] = False
+    _status_changed()
     
     message = f"Stop request received. Stopping {stopped_count} active scraper(s)."
-    return jsonify({"message": message}), 200
+    return _json({"message": message})
 
 @app.route('/api/trigger-enrichment', methods=['POST', 'GET'])
 def trigger_enrichment():
-    if enrichment_status["running"]:
-        return jsonify({"error": "Enrichment is already running"}), 400
+    if not _claim_process("Enrichment"):
+        return _json({"error": "Enrichment is already running"}, 400)
     
     limit = request.args.get("limit", 50)
     source = request.args.get("source") # Optional priority source
@@ -1037,100 +1279,82 @@ def trigger_enrichment():
     except:
         limit = 50
         
-    def worker():
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        
-        cmd = [sys.executable, "batchdata_worker.py", "--limit", str(limit)]
-        if source:
-            cmd.extend(["--source", source])
-            
-        run_process_with_logging(
-            cmd,
-            base_dir,
-            "Enrichment",
-            enrichment_status
-        )
+    cmd = [*ENRICHMENT_CMD, "--limit", str(limit)]
+    if source:
+        cmd.extend(["--source", source])
     
-    thread = threading.Thread(target=worker)
-    thread.daemon = True
-    thread.start()
+    start_process(cmd, BASE_DIR, "Enrichment")
     
     msg = f"Enrichment started with limit {limit}"
     if source:
         msg += f" (Prioritizing {source})"
         
-    return jsonify({"message": msg})
+    return _json({"message": msg})
 
 @app.route('/api/status-enrichment', methods=['GET'])
 def get_enrichment_status():
-    return jsonify({
-        "status": "running" if enrichment_status["running"] else "idle",
-        "last_run": enrichment_status["last_run"],
-        "error": enrichment_status["error"]
-    })
+    return _status("Enrichment")
 
-@app.route('/api/enrichment-stats', methods=['GET'])
-def get_enrichment_stats():
-    """Return enrichment statistics for dashboard display."""
-    try:
-        from supabase import create_client
-        from dotenv import load_dotenv
-        load_dotenv()
-        
-        url = os.environ.get("SUPABASE_URL")
-        key = os.environ.get("SUPABASE_KEY") or os.environ.get("SUPABASE_SERVICE_KEY") or os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
-        if not url or not key:
-            return jsonify({"error": "Database not configured"}), 500
-            
-        supabase = create_client(url, key)
-        
+# Cleared once enrichment_stats_v1() turns out not to be installed (see
+# setup_enrichment_stats_function.sql); the stats then come from individual count queries.
+# Any other RPC error only falls back for that request.
+_stats_rpc_available = True
+
+def _count_enrichment_stats(supabase):
+    """Dashboard counts as { "pending", "enriched", "no_data", "scraped", "batchdata", "owners" }"""
+    global _stats_rpc_available
+    if _stats_rpc_available:
+        try:
+            # One round trip: all counts are computed server-side in a single pass
+            return supabase.rpc("enrichment_stats_v1").execute().data[0]
+        except Exception as e:
+            if is_missing_function(e):
+                _stats_rpc_available = False
+                add_log(f"enrichment_stats_v1() not installed, using count queries: {e}", "warning")
+            else:
+                add_log(f"enrichment_stats_v1() failed, using count queries this time: {e}", "warning")
+    
+    state = "property_owner_enrichment_state"
+    queries = (
         # Get counts by status from enrichment_state (for queue tracking)
-        pending = supabase.table("property_owner_enrichment_state") \
-            .select("*", count="exact", head=True) \
-            .eq("status", "never_checked") \
-            .eq("locked", False) \
-            .execute()
-            
-        enriched_state = supabase.table("property_owner_enrichment_state") \
-            .select("*", count="exact", head=True) \
-            .eq("status", "enriched") \
-            .execute()
-            
-        no_data = supabase.table("property_owner_enrichment_state") \
-            .select("*", count="exact", head=True) \
-            .eq("status", "no_owner_data") \
-            .execute()
-        
+        lambda: supabase.table(state).select("*", count="exact", head=True).eq("status", "never_checked").eq("locked", False).execute(),
+        lambda: supabase.table(state).select("*", count="exact", head=True).eq("status", "enriched").execute(),
+        lambda: supabase.table(state).select("*", count="exact", head=True).eq("status", "no_owner_data").execute(),
         # Count by source_used to show smart skips
-        scraped = supabase.table("property_owner_enrichment_state") \
-            .select("*", count="exact", head=True) \
-            .eq("source_used", "scraped") \
-            .execute()
-            
+        lambda: supabase.table(state).select("*", count="exact", head=True).eq("source_used", "scraped").execute(),
         # Only count ACTUAL paid API calls (exclude buggy never_checked entries)
-        batchdata = supabase.table("property_owner_enrichment_state") \
-            .select("*", count="exact", head=True) \
-            .eq("source_used", "batchdata") \
-            .neq("status", "never_checked") \
-            .execute()
-        
+        lambda: supabase.table(state).select("*", count="exact", head=True).eq("source_used", "batchdata").neq("status", "never_checked").execute(),
         # Get ACTUAL count from property_owners table (source of truth)
         # This is the real number of addresses with owner data
-        property_owners_total = supabase.table("property_owners") \
-            .select("*", count="exact", head=True) \
-            .execute()
+        lambda: supabase.table("property_owners").select("*", count="exact", head=True).execute(),
+    )
+    
+    # The counts are independent round trips, so issue them concurrently (wall time ~ slowest query)
+    with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+        results = pool.map(lambda query: query(), queries)
+        return dict(zip(("pending", "enriched", "no_data", "scraped", "batchdata", "owners"), (r.count for r in results)))
+
+@app.route('/api/enrichment-stats', methods=['GET'])
+@ttl_cache(10.0)
+def get_enrichment_stats():
+    """Return enrichment statistics for dashboard display."""
+    if SUPABASE is None:
+        return _json({"error": "Database not configured"}, 500)
+    
+    try:
+        counts = _count_enrichment_stats(SUPABASE)
         
-        return jsonify({
-            "pending": pending.count or 0,
-            "enriched": enriched_state.count or 0,  # Count from enrichment_state (for queue tracking)
-            "enriched_owners": property_owners_total.count or 0,  # ACTUAL count from property_owners table
-            "no_data": no_data.count or 0,
-            "smart_skipped": scraped.count or 0,
-            "api_calls": batchdata.count or 0,
-            "is_running": enrichment_status["running"]
+        return _json({
+            "pending": counts["pending"] or 0,
+            "enriched": counts["enriched"] or 0,  # Count from enrichment_state (for queue tracking)
+            "enriched_owners": counts["owners"] or 0,  # ACTUAL count from property_owners table
+            "no_data": counts["no_data"] or 0,
+            "smart_skipped": counts["scraped"] or 0,
+            "api_calls": counts["batchdata"] or 0,
+            "is_running": STATUSES["Enrichment"]["running"]
         })
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return _json({"error": str(e)}, 500)
 
 if __name__ == '__main__':
     # Start scheduler in background (runs all scrapers daily at midnight)
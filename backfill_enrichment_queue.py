@@ -2,7 +2,13 @@ import os
 import sys
 import re
 import logging
+import threading
+import time
+import functools
+from operator import itemgetter
+from itertools import islice
 from typing import List, Dict, Set
+from concurrent.futures import ThreadPoolExecutor
 from supabase import create_client, Client
 from dotenv import load_dotenv
 from pathlib import Path
@@ -12,8 +18,9 @@ project_root = Path(__file__).resolve().parents[0]
 if str(project_root) not in sys.path:
     sys.path.append(str(project_root))
 
-from utils.address_utils import normalize_address, generate_address_hash
+from utils.address_utils import normalize_addresses, generate_address_hashes
 from utils.placeholder_utils import clean_owner_data, is_owner_data_complete
+from utils.supabase_utils import is_missing_function, is_rejected_data
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -40,7 +47,7 @@ LISTING_TABLES = [
         "table": "zillow_fsbo_listings",
         "address_col": "address",
         "source": "Zillow FSBO",
-        "owner_cols": ["owner_name", "owner_email", "phone_numbers"]
+        "owner_cols": ["owner_name", "owner_email", "phone_number"]
     },
     {
         "table": "zillow_frbo_listings",
@@ -52,7 +59,8 @@ LISTING_TABLES = [
         "table": "hotpads_listings",
         "address_col": "address",
         "source": "Hotpads",
-        "owner_cols": ["contact_name", "url", "phone_number"] # email is often placeholder, check contact_name/phone
+        "owner_cols": ["contact_name", "url", "phone_number"], # email is often placeholder, check contact_name/phone
+        "extra_cols": ["owner_name", "owner_phone"] # Preferred by make_listing_mapper when present
     },
     {
         "table": "apartments_frbo",
@@ -80,183 +88,385 @@ LISTING_TABLES = [
     }
 ]
 
-def map_listing_cols(table_config, listing):
-    """Maps varied column names to standard owner fields."""
+def make_listing_mapper(table_config):
+    """Build the owner-field mapper for one table: listing -> (name, email, phone).
+    
+    Column names are resolved once here instead of on every row.
+    """
     cols = table_config['owner_cols']
     
     # Generic mapping
-    # 0: name, 1: email, 2: phone
-    # Some tables might have different order or names, let's be robust
-    
-    name = listing.get(cols[0]) if len(cols) > 0 else None
+    # 0: name, 1: email, 2: phone (missing positions map to None)
+    name_col, email_col, phone_col = (cols + [None, None, None])[:3]
     
-    # Special handling for tables where index 1 might not be email or index 2 phone
-    email = None
-    phone = None
-    
-    if len(cols) > 1:
-        val = listing.get(cols[1])
-        # Heuristic: if it looks like email/list of emails
-        email = val
-        
-    if len(cols) > 2:
-        val = listing.get(cols[2])
-        phone = val
-        
     # Specific overrides based on known schemas
     if table_config['table'] == 'hotpads_listings':
-        if 'owner_name' in listing: name = listing.get('owner_name')
-        if 'owner_phone' in listing: phone = listing.get('owner_phone')
+        # Prefer owner_name/owner_phone when the row has them
         # email is unreliable in hotpads (support@hotpads.com)
-        
-    return name, email, phone
+        def mapper(listing):
+            name = listing['owner_name'] if 'owner_name' in listing else listing.get(name_col)
+            phone = listing['owner_phone'] if 'owner_phone' in listing else listing.get(phone_col)
+            return name, listing.get(email_col), phone
+        return mapper
+    
+    def mapper(listing):
+        return listing.get(name_col), listing.get(email_col), listing.get(phone_col)
+    return mapper
 
-def backfill_enrichment_queue():
-    url = os.getenv("SUPABASE_URL")
-    key = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_KEY")
-    if not url or not key:
-        logger.error("Supabase credentials missing.")
+for _config in LISTING_TABLES:
+    _config['mapper'] = make_listing_mapper(_config)
+del _config
+
+# Rows per request. Tables are read with keyset pagination (WHERE key > last ORDER BY key),
+# so every page is an index range scan; OFFSET paging re-scans all earlier rows each time.
+PAGE_SIZE = 1000
+
+def fetch_page(supabase, table_name, columns, after=None, key="id"):
+    """Fetch up to PAGE_SIZE rows of a table with key > after, in key order."""
+    query = supabase.table(table_name).select(columns).order(key).limit(PAGE_SIZE)
+    if after is not None:
+        query = query.gt(key, after)
+    return query.execute().data
+
+def iter_pages(supabase, table_name, columns, key="id"):
+    """Yield a table page by page (keyset order), fetching the next page in the background
+    while the caller is still working on the current one."""
+    with ThreadPoolExecutor(max_workers=1) as prefetcher:
+        rows = fetch_page(supabase, table_name, columns, key=key)
+        while rows:
+            # The next page only needs this page's last key, so request it before handing rows out
+            next_page = prefetcher.submit(fetch_page, supabase, table_name, columns, rows[-1][key], key) if len(rows) == PAGE_SIZE else None
+            yield rows
+            if next_page is None:
+                break
+            rows = next_page.result()
+
+# Rows per enrichment-state upsert; a batch can span several listing pages
+UPSERT_BATCH_SIZE = 500
+
+# Flipped off the first time the RPC is missing (setup_backfill_functions.sql not run yet),
+# so later pages go straight to the row-by-row fallback; other RPC errors only affect one page
+_bulk_hash_rpc_available = True
+
+def bulk_update_address_hash(supabase, table_name, pairs):
+    """Write a page of {"id", "address_hash"} pairs back to a listing table.
+    
+    Uses the bulk_update_address_hash() RPC (one round trip for the whole page) and
+    falls back to one UPDATE per row if it isn't installed.
+    """
+    global _bulk_hash_rpc_available
+    if not pairs:
         return
+    if _bulk_hash_rpc_available:
+        try:
+            supabase.rpc("bulk_update_address_hash", {"table_name": table_name, "pairs": pairs}).execute()
+            return
+        except Exception as e:
+            if is_missing_function(e):
+                _bulk_hash_rpc_available = False
+                logger.warning("bulk_update_address_hash RPC unavailable (%s); updating hashes row by row. Run setup_backfill_functions.sql to enable it.", e)
+            else:
+                logger.warning("bulk_update_address_hash RPC failed (%s); updating this page row by row", e)
+    for pair in pairs:
+        try:
+            supabase.table(table_name).update({"address_hash": pair["address_hash"]}).eq("id", pair["id"]).execute()
+        except Exception as e:
+            logger.warning("Failed to backfill hash for %s row: %s", table_name, e)
 
-    supabase: Client = create_client(url, key)
+# Same as _bulk_hash_rpc_available: only a missing function turns the RPC off for the run
+_fill_address_rpc_available = True
 
-    # 1. Fetch current enrichment state to avoid duplicates
-    # We want to know if they exist at all.
-    logger.info("Fetching existing enrichment state...")
-    existing_state_hashes = set()
-    page = 0
-    while True:
-        res = supabase.table("property_owner_enrichment_state").select("address_hash").range(page*1000, (page+1)*1000 - 1).execute()
-        rows = res.data
-        if not rows: break
-        for r in rows: existing_state_hashes.add(r['address_hash'])
-        page += 1
-        if len(rows) < 1000: break
+def fill_missing_original_address(supabase, rows):
+    """Set original_address on queued enrichment rows where it is still NULL.
     
-    logger.info(f"Found {len(existing_state_hashes)} existing records in enrichment state.")
+    rows are {"address_hash", "original_address"} dicts with unique hashes. Uses the
+    fill_missing_original_address() RPC (one round trip) and falls back to one UPDATE
+    per row if it isn't installed.
+    """
+    global _fill_address_rpc_available
+    if not rows:
+        return
+    if _fill_address_rpc_available:
+        try:
+            supabase.rpc("fill_missing_original_address", {"rows": rows}).execute()
+            return
+        except Exception as e:
+            if is_missing_function(e):
+                _fill_address_rpc_available = False
+                logger.warning("fill_missing_original_address RPC unavailable (%s); updating row by row. Run setup_backfill_functions.sql to enable it.", e)
+            else:
+                logger.warning("fill_missing_original_address RPC failed (%s); updating this batch row by row", e)
+    for row in rows:
+        try:
+            supabase.table("property_owner_enrichment_state").update({"original_address": row["original_address"]}).eq("address_hash", row["address_hash"]).is_("original_address", "null").execute()
+        except: pass
 
-    # 2. Fetch property_owners to check if we already have data (possibly from other sources)
-    # If we have complete data there, we don't need to queue.
-    # CRITICAL: We now check mailing_address too!
-    logger.info("Fetching property_owners completeness data...")
-    property_owners_complete = set()
-    page = 0
-    while True:
-        res = supabase.table("property_owners").select("address_hash, owner_name, owner_email, owner_phone, mailing_address").range(page*1000, (page+1)*1000 - 1).execute()
-        rows = res.data
-        if not rows: break
-        for r in rows:
-            is_complete, _ = is_owner_data_complete(r.get('owner_name'), r.get('owner_email'), r.get('owner_phone'), r.get('mailing_address'))
-            if is_complete:
-                property_owners_complete.add(r['address_hash'])
-        page += 1
-        if len(rows) < 1000: break
+_get_hash = itemgetter('address_hash')
+
+# Probe attempts before a transient error (timeout, dropped connection, 5xx) aborts the run
+LOOKUP_PROBE_ATTEMPTS = 3
+
+def lookup_rpc_available(supabase):
+    """Whether the lookup_address_hashes() RPC from setup_backfill_functions.sql is installed.
     
-    logger.info(f"Found {len(property_owners_complete)} records with COMPLETE data in property_owners.")
+    Only a missing function means "not installed"; any other error is retried and then raised,
+    so a flaky connection can't silently switch the run to preloading every known hash.
+    """
+    for attempt in range(1, LOOKUP_PROBE_ATTEMPTS + 1):
+        try:
+            supabase.rpc("lookup_address_hashes", {"hashes": []}).execute()
+            return True
+        except Exception as e:
+            if is_missing_function(e):
+                logger.warning("lookup_address_hashes RPC unavailable (%s); loading all known hashes up front. Run setup_backfill_functions.sql to enable it.", e)
+                return False
+            if attempt == LOOKUP_PROBE_ATTEMPTS:
+                raise
+            logger.warning("lookup_address_hashes probe failed (%s); retrying (%d/%d)", e, attempt, LOOKUP_PROBE_ATTEMPTS)
+            time.sleep(2 ** attempt)
+
+def lookup_address_hashes(supabase, hashes):
+    """Split one page's hashes into (already queued, complete in property_owners) sets.
+    
+    One RPC per page does the anti-join in the database, so the client never holds the whole
+    enrichment state or property_owners table in memory.
+    """
+    rows = supabase.rpc("lookup_address_hashes", {"hashes": hashes}).execute().data or []
+    queued = {r['address_hash'] for r in rows if r['queued']}
+    complete = {r['address_hash'] for r in rows if r['complete']}
+    return queued, complete
+
+def fetch_queued_hashes(supabase):
+    """Set of every address_hash already in property_owner_enrichment_state."""
+    queued = set()
+    for rows in iter_pages(supabase, "property_owner_enrichment_state", "id, address_hash"):
+        queued.update(map(_get_hash, rows))
+    return queued
 
-    # 3. Iterate through all listing tables
-    total_queued = 0
+def fetch_complete_owner_hashes(supabase):
+    """Set of property_owners address_hashes whose owner data is complete.
+    
+    Reads the property_owners_complete_v view, which filters in the database and returns only
+    complete rows' hashes. Falls back to downloading every property_owners row and checking it
+    with is_owner_data_complete if the view isn't installed.
+    """
+    try:
+        complete = set()
+        for rows in iter_pages(supabase, "property_owners_complete_v", "id, address_hash"):
+            complete.update(map(_get_hash, rows))
+        return complete
+    except Exception as e:
+        logger.warning("property_owners_complete_v unavailable (%s); checking completeness in Python. Run setup_backfill_functions.sql to enable it.", e)
+    
+    complete = set()
+    for rows in iter_pages(supabase, "property_owners", "id, address_hash, owner_name, owner_email, owner_phone, mailing_address"):
+        complete.update(
+            r['address_hash'] for r in rows
+            if is_owner_data_complete(r.get('owner_name'), r.get('owner_email'), r.get('owner_phone'), r.get('mailing_address'))[0]
+        )
+    return complete
+
+def iter_table_candidates(supabase, config, lookup, seen, seen_lock):
+    """Yield an enrichment-state row for every address in one listing table that still needs
+    enrichment, reading the table a page at a time.
+    
+    lookup(hashes) returns the (already queued, complete in property_owners) hash sets for a
+    page; seen holds the hashes already handled in this run (shared by all tables, guarded by
+    seen_lock). Also writes corrected address hashes back to the table as it goes.
+    """
+    table_name = config['table']
+    source = config['source']
+    mapper = config['mapper']
     
-    for config in LISTING_TABLES:
-        table_name = config['table']
-        source = config['source']
-        logger.info(f"Processing table: {table_name}...")
+    # Paginate through listings
+    # Select only what the loop reads: key, stored hash, address + owner columns
+    cols_to_fetch = ["id", "address_hash", config['address_col']] + config['owner_cols'] + config.get('extra_cols', [])
+    pages = iter_pages(supabase, table_name, ",".join(dict.fromkeys(cols_to_fetch)))
+    page = 0
+    while True:
+        try:
+            listings = next(pages, None)
+        except Exception as e:
+            logger.error("Error fetching %s page %d: %s", table_name, page, e)
+            # The next page starts after this one's last id, so there is nothing to skip ahead to
+            break
         
-        # Paginate through listings
-        page = 0
-        while True:
-            try:
-                # Select address + owner columns
-                cols_to_fetch = [config['address_col']] + config['owner_cols']
-                res = supabase.table(table_name).select("*").range(page*1000, (page+1)*1000 - 1).execute()
-                listings = res.data
-                
-                if not listings: break
-                
-                batch_to_insert = []
+        if not listings: break
+        
+        try:
+            batch_to_insert = []
+            hash_updates = []  # {"id", "address_hash"} pairs, written back in one call after the page
+            address_fills = {}  # address_hash -> raw address, for already-queued hashes
+            
+            # Normalize and hash the whole page up front
+            raw_addrs = [listing.get(config['address_col']) for listing in listings]
+            normalized_addrs = normalize_addresses(raw_addrs)
+            address_hashes = generate_address_hashes(normalized_addrs)
+            existing_state_hashes, property_owners_complete = lookup([h for h in set(address_hashes) if h and h not in seen])
+            
+            for listing, raw_addr, normalized, address_hash in zip(listings, raw_addrs, normalized_addrs, address_hashes):
+                if not raw_addr: continue
                 
-                for listing in listings:
-                    raw_addr = listing.get(config['address_col'])
-                    if not raw_addr: continue
-                    
-                    normalized = normalize_address(raw_addr)
-                    address_hash = generate_address_hash(normalized)
-                    
-                    # REQUIREMENT C: Ensure address_hash is consistent across all listing tables
-                    # We must backfill the address_hash to the source table if it's missing/different
-                    # We do this update regardless of queueing to ensure frontend joins work.
-                    current_hash = listing.get('address_hash')
-                    if current_hash != address_hash:
-                         try:
-                             # Efficiently update just this row? 
-                             # Or maybe do it in bulk if many are missing? 
-                             # For simplicity and safety in this script, we update individually or could batch.
-                             # Given Supabase Python client limits, individual updates might be slow but safe.
-                             # Let's try to update. assuming primary key?
-                             # Most tables don't have a clean single PK we grabbed.
-                             # We grabbed '*' so maybe we have 'id'.
-                             if 'id' in listing:
-                                 supabase.table(table_name).update({"address_hash": address_hash}).eq("id", listing['id']).execute()
-                             elif config['table'] == 'hotpads_listings':
-                                 # Hotpads uses url as PK often?
-                                 if 'url' in listing:
-                                     supabase.table(table_name).update({"address_hash": address_hash}).eq("url", listing['url']).execute()
-                         except Exception as e:
-                             logger.warning(f"Failed to backfill hash for {table_name} row: {e}")
-
-                    # CHECK 1: Is it already in enrichment state?
-                    if address_hash in existing_state_hashes:
-                        # Ensure original_address is populated if missing
-                        try:
-                            supabase.table("property_owner_enrichment_state").update({"original_address": raw_addr}).eq("address_hash", address_hash).is_("original_address", "null").execute()
-                        except: pass
+                # REQUIREMENT C: Ensure address_hash is consistent across all listing tables
+                # We must backfill the address_hash to the source table if it's missing/different
+                # We do this update regardless of queueing to ensure frontend joins work.
+                current_hash = listing.get('address_hash')
+                if current_hash != address_hash:
+                     try:
+                         # Rows with an id are collected and written back in bulk after the page
+                         if 'id' in listing:
+                             hash_updates.append({"id": listing['id'], "address_hash": address_hash})
+                         elif config['table'] == 'hotpads_listings':
+                             # Hotpads uses url as PK often?
+                             if 'url' in listing:
+                                 supabase.table(table_name).update({"address_hash": address_hash}).eq("url", listing['url']).execute()
+                     except Exception as e:
+                         logger.warning("Failed to backfill hash for %s row: %s", table_name, e)
+
+                # The same property is often listed on several sites (and tables run concurrently):
+                # only the first occurrence in this run goes through the checks below
+                with seen_lock:
+                    if address_hash in seen:
                         continue
-                        
-                    # CHECK 2: Do we already have complete data (including mailing) in property_owners?
-                    if address_hash in property_owners_complete:
-                         continue
-                         
-                    # Determine missing fields (just for metadata, though property_owners check is authoritative)
-                    # We can use the listing data to populate missing fields calc, just so we know what's there
-                    name, email, phone = map_listing_cols(config, listing)
-                    _, missing = is_owner_data_complete(name, email, phone, None) # mailing always missing in listing table usually
-                    
-                    # If we are here, we need enrichment.
-                    batch_to_insert.append({
-                        "address_hash": address_hash,
-                        "normalized_address": normalized,
-                        "original_address": raw_addr,
-                        "status": "never_checked",
-                        "locked": False,
-                        "listing_source": source,
-                        "missing_fields": missing
-                    })
+                    seen.add(address_hash)
+
+                # CHECK 1: Is it already in enrichment state?
+                if address_hash in existing_state_hashes:
+                    # Ensure original_address is populated if missing (applied after the page)
+                    address_fills[address_hash] = raw_addr
+                    continue
                     
-                    # Update local set so we don't double queue duplicates in same run
-                    existing_state_hashes.add(address_hash)
-
-                if batch_to_insert:
-                    try:
-                        # Upsert to enrichment state
-                        # on_conflict="address_hash" should handle dupes, but we wrap in try just in case
-                        supabase.table("property_owner_enrichment_state").upsert(batch_to_insert, on_conflict="address_hash").execute()
-                        total_queued += len(batch_to_insert)
-                        logger.info(f"  Queued {len(batch_to_insert)} items from {table_name} (Page {page})")
-                    except Exception as e:
-                        logger.error(f"  Error inserting batch for {table_name}: {e}")
-                        # Optionally try one by one if batch fails? For now just log.
-
-                page += 1
-                if len(listings) < 1000: break
+                # CHECK 2: Do we already have complete data (including mailing) in property_owners?
+                if address_hash in property_owners_complete:
+                     continue
+                     
+                # Determine missing fields (just for metadata, though property_owners check is authoritative)
+                # We can use the listing data to populate missing fields calc, just so we know what's there
+                name, email, phone = mapper(listing)
+                _, missing = is_owner_data_complete(name, email, phone, None) # mailing always missing in listing table usually
                 
-            except Exception as e:
-                logger.error(f"Error processing {table_name} page {page}: {e}")
-                # Don't break, try next page/table?
-                # If page fails, maybe next page works.
-                page += 1 
-                continue
-
-    logger.info(f"Backfill complete. Total new items queued: {total_queued}")
+                # If we are here, we need enrichment.
+                batch_to_insert.append({
+                    "address_hash": address_hash,
+                    "normalized_address": normalized,
+                    "original_address": raw_addr,
+                    "status": "never_checked",
+                    "locked": False,
+                    "listing_source": source,
+                    "missing_fields": missing
+                })
+
+            bulk_update_address_hash(supabase, table_name, hash_updates)
+            fill_missing_original_address(supabase, [
+                {"address_hash": h, "original_address": addr} for h, addr in address_fills.items()
+            ])
+
+            yield from batch_to_insert
+
+        except Exception as e:
+            logger.error("Error processing %s page %d: %s", table_name, page, e)
+            # Don't break - the next page may still work
+
+        page += 1
+
+def process_listing_table(supabase, config, lookup, seen, seen_lock):
+    """Queue every address in one listing table that still needs enrichment.
+    
+    Candidates are upserted in fixed-size batches as they stream out of the table scan, so
+    memory stays bounded by one page plus one batch. Returns the number of addresses queued.
+    """
+    table_name = config['table']
+    logger.info("Processing table: %s...", table_name)
+    queued = 0
+    
+    candidates = iter_table_candidates(supabase, config, lookup, seen, seen_lock)
+    while batch_to_insert := list(islice(candidates, UPSERT_BATCH_SIZE)):
+        inserted = upsert_queue_rows(supabase, batch_to_insert, table_name)
+        queued += inserted
+        logger.info("  Queued %d items from %s (%d so far)", inserted, table_name, queued)
+
+    return queued
+
+# How many times a rejected batch may be halved; 2**9 > UPSERT_BATCH_SIZE, so this reaches single rows
+MAX_SPLIT_DEPTH = 9
+
+def upsert_queue_rows(supabase, rows, table_name, depth=0):
+    """Upsert rows into the enrichment state, returning how many made it in.
+    
+    If PostgREST rejects the data (constraint violation / invalid input), the batch is split in
+    half and each half retried, down to single rows, so only the bad rows are dropped. One bad
+    row costs about 2*log2(batch) extra requests, each further bad row up to that again, and a
+    batch where every row is bad at most 2*batch.
+    Any other error (outage, timeout, 5xx, auth) fails the whole batch with one log line, since
+    smaller requests would fail the same way.
+    """
+    try:
+        # Upsert to enrichment state
+        # on_conflict="address_hash" should handle dupes, but we wrap in try just in case
+        supabase.table("property_owner_enrichment_state").upsert(rows, on_conflict="address_hash").execute()
+        return len(rows)
+    except Exception as e:
+        if not is_rejected_data(e):
+            logger.error("  Error inserting batch of %d for %s, skipping it: %s", len(rows), table_name, e)
+            return 0
+        if len(rows) == 1:
+            logger.error("  Error inserting %s row %s: %s", table_name, rows[0].get("address_hash"), e)
+            return 0
+        if depth >= MAX_SPLIT_DEPTH:
+            logger.error("  Batch of %d for %s still rejected after %d splits, skipping it: %s", len(rows), table_name, depth, e)
+            return 0
+        logger.warning("  Batch of %d for %s rejected, retrying in halves: %s", len(rows), table_name, e)
+    mid = len(rows) // 2
+    return (upsert_queue_rows(supabase, rows[:mid], table_name, depth + 1)
+            + upsert_queue_rows(supabase, rows[mid:], table_name, depth + 1))
+
+def backfill_enrichment_queue():
+    url = os.getenv("SUPABASE_URL")
+    key = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_KEY")
+    if not url or not key:
+        logger.error("Supabase credentials missing.")
+        return
+
+    supabase: Client = create_client(url, key)
+
+    # 1. Decide how to tell which addresses are already queued / already have complete owner data
+    try:
+        use_lookup_rpc = lookup_rpc_available(supabase)
+    except Exception as e:
+        logger.error("Could not check for lookup_address_hashes (%s); aborting rather than preloading every known hash.", e)
+        return
+    if use_lookup_rpc:
+        # Checked in the database one page at a time, so nothing is preloaded
+        logger.info("Checking enrichment state and property_owners per page via lookup_address_hashes.")
+        lookup = functools.partial(lookup_address_hashes, supabase)
+    else:
+        # Fetch current enrichment state to avoid duplicates
+        # We want to know if they exist at all.
+        logger.info("Fetching existing enrichment state...")
+        existing_state_hashes = fetch_queued_hashes(supabase)
+        logger.info("Found %d existing records in enrichment state.", len(existing_state_hashes))
+
+        # Fetch property_owners to check if we already have data (possibly from other sources)
+        # If we have complete data there, we don't need to queue.
+        # CRITICAL: We now check mailing_address too!
+        logger.info("Fetching property_owners completeness data...")
+        property_owners_complete = fetch_complete_owner_hashes(supabase)
+        logger.info("Found %d records with COMPLETE data in property_owners.", len(property_owners_complete))
+
+        lookup = lambda hashes: (existing_state_hashes, property_owners_complete)
+
+    # 2. Iterate through all listing tables
+    # Tables are independent, so they are scanned concurrently; the only shared state is the
+    # set of hashes handled during this run, which is updated under seen_lock.
+    seen = set()
+    seen_lock = threading.Lock()
+    with ThreadPoolExecutor(max_workers=len(LISTING_TABLES)) as executor:
+        total_queued = sum(executor.map(
+            lambda config: process_listing_table(supabase, config, lookup, seen, seen_lock),
+            LISTING_TABLES
+        ))
+
+    logger.info("Backfill complete. Total new items queued: %d", total_queued)
 
 if __name__ == "__main__":
     backfill_enrichment_queue()
@@ -1,9 +1,16 @@
 import os
+import re
+import signal
 import time
 import logging
+import threading
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from supabase import create_client, Client
 from dotenv import load_dotenv
 from pathlib import Path
@@ -16,6 +23,7 @@ if str(project_root) not in sys.path:
 
 from utils.address_utils import normalize_address
 from utils.placeholder_utils import clean_owner_data
+from utils.supabase_utils import is_missing_function
 
 # Set up logging
 logging.basicConfig(
@@ -27,6 +35,93 @@ logger = logging.getLogger(__name__)
 # Load env vars
 load_dotenv()
 
+# Map the listing_source values found in the queue to their listing tables
+SOURCE_MAP: Dict[str, str] = {
+    'fsbo': 'listings',
+    'forsalebyowner': 'listings',
+    'zillow-fsbo': 'zillow_fsbo_listings',
+    'zillow fsbo': 'zillow_fsbo_listings',
+    'zillow-frbo': 'zillow_frbo_listings',
+    'zillow frbo': 'zillow_frbo_listings',
+    'hotpads': 'hotpads_listings',
+    'apartments': 'apartments_frbo',
+    'apartments.com': 'apartments_frbo',
+    'trulia': 'trulia_listings',
+    'redfin': 'redfin_listings'
+}
+
+# Owner/contact columns of each listing table, checked for SMART SKIP
+OWNER_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    'listings': ('owner_name', 'owner_emails', 'owner_phones'),
+    'zillow_fsbo_listings': ('owner_name', 'owner_email', 'phone_number'),
+    'zillow_frbo_listings': ('owner_name', 'owner_email', 'phone_number'),
+    'hotpads_listings': ('owner_name', 'email', 'owner_phone', 'phone_number'),
+    'apartments_frbo': ('owner_name', 'owner_email', 'phone_numbers'),
+    'trulia_listings': ('owner_name', 'emails', 'phones'),
+    'redfin_listings': ('owner_name', 'emails', 'phones')
+}
+
+# Owner column values that don't count as existing owner info for SMART SKIP
+# (compared stripped and lowercased; '[]' / '{}' are empty JSON arrays/objects)
+_INVALID_OWNER_VALUES = frozenset({'n/a', 'unknown', 'none', 'null', '', '[]', '{}'})
+
+# Listing tables that have a mailing_address column
+MAILING_ADDR_TABLES = frozenset({'listings', 'trulia_listings', 'redfin_listings'})
+
+# Where enriched contact info is written back in each listing table:
+# (owner_data key, column, stored as a one-element list)
+SYNC_BACK_COLUMNS: Dict[str, Tuple[Tuple[str, str, bool], ...]] = {
+    # JSONB arrays for emails and phones
+    'listings': (('owner_email', 'owner_emails', True), ('owner_phone', 'owner_phones', True)),
+    'zillow_fsbo_listings': (('owner_phone', 'phone_number', False), ('owner_email', 'owner_email', False)),
+    'zillow_frbo_listings': (('owner_phone', 'phone_number', False), ('owner_email', 'owner_email', False)),
+    'apartments_frbo': (('owner_email', 'owner_email', False), ('owner_phone', 'phone_numbers', True)),
+    # Phone goes to both owner_phone and phone_number
+    'hotpads_listings': (('owner_email', 'email', False), ('owner_phone', 'owner_phone', False),
+                         ('owner_phone', 'phone_number', False)),
+    # 'emails' / 'phones' hold a plain string
+    'trulia_listings': (('owner_email', 'emails', False), ('owner_phone', 'phones', False)),
+    'redfin_listings': (('owner_email', 'emails', False), ('owner_phone', 'phones', False))
+}
+
+def _utc_now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+def _extract_owner(first_person: Dict) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]:
+    """Pull (full_name, email, phone, mailing_address) out of one skip-trace person."""
+    # Extract Owner Name
+    # Priority 1: property.owner.name
+    # Priority 2: first_person.name
+    full_name = None
+    owner_obj = (first_person.get('property') or {}).get('owner') or {}
+    o_name = owner_obj.get('name') or {}
+    if o_name.get('first') or o_name.get('last'):
+        full_name = f"{o_name.get('first') or ''} {o_name.get('last') or ''}".strip()
+
+    if not full_name:
+        p_name = first_person.get('name') or {}
+        full_name = f"{p_name.get('first') or ''} {p_name.get('last') or ''}".strip()
+
+    # Extract Mailing Address
+    # Usually under property.owner.mailingAddress
+    mailing_address = None
+    mailing_obj = owner_obj.get('mailingAddress')
+    if mailing_obj and mailing_obj.get('street') and mailing_obj.get('city'):
+        mailing_address = (f"{mailing_obj['street']}, {mailing_obj['city']}, "
+                           f"{mailing_obj.get('state', '')} {mailing_obj.get('zip', '')}").strip()
+
+    # First email / phone (v1 uses phoneNumbers)
+    email = next((e['email'] for e in first_person.get('emails') or () if e.get('email')), None)
+    phone = next((p['number'] for p in first_person.get('phoneNumbers') or () if p.get('number')), None)
+
+    return full_name, email, phone, mailing_address
+
+# The two address shapes parse_address_string sees almost every time:
+# "Street, City, ST 12345" and normalized "STREET WORDS CITY ST 12345" (single-spaced).
+# Anything else goes through the split-based fallback.
+_ADDR_RE = re.compile(r"^\s*(?P<street>[^,]*?)\s*,\s*(?P<city>[^,]*?)\s*,\s*(?P<state>[A-Za-z]{2})\s+(?P<zip>\d{5}(?:-\d{4})?)\s*$")
+_ADDR_NOCOMMA_RE = re.compile(r"^(?P<street>[^\s,]+(?: [^\s,]+)*?) (?P<city>[^\s,]+) (?P<state>[A-Za-z]{2}) (?P<zip>\d{5}(?:-\d{4})?)$")
+
 class BatchDataWorker:
     def __init__(self):
         # Supabase config
@@ -40,13 +135,61 @@ class BatchDataWorker:
         self.api_key = os.getenv("BATCHDATA_API_KEY")
         self.api_enabled = os.getenv("BATCHDATA_ENABLED", "false").lower() == "true"
         self.daily_limit = int(os.getenv("BATCHDATA_DAILY_LIMIT", "50"))
+        # How many properties are enriched at once (each one is several Supabase/BatchData round trips)
+        self.concurrency = max(1, int(os.getenv("BATCHDATA_CONCURRENCY", "4")))
+        # Wall-clock cap on one run; properties not started by then are released for the next run
+        self.wall_budget = float(os.getenv("BATCHDATA_WALL_BUDGET_SEC", "600"))
         # Phase 2: Add DRY RUN flag
         self.dry_run = os.getenv("BATCHDATA_DRY_RUN", "false").lower() == "true"
         self.cost_per_call = 0.085  # USD (Updated from $0.07)
         self.api_url = "https://api.batchdata.com/api/v1/property/skip-trace"
+        # Each flipped off the first time its RPC is missing, so later runs go straight to
+        # the fallback; any other RPC error only sends that one call to the fallback
+        self._batch_lock_rpc_available = True
+        self._priority_lock_rpc_available = True
+        self._marks_rpc_available = True
+        self._save_rpc_available = True
+
+        # Terminal state marks and source-table statuses are queued while a run's properties
+        # are processed (possibly from several threads) and written together by _flush_marks().
+        # Marks for properties that hit the paid API are flushed as soon as that property is done;
+        # free ones (smart skips, orphans) wait for the next flush.
+        # Reentrant because the SIGTERM handler flushes from the main thread.
+        self._state_lock = threading.RLock()
+        self._pending_marks: List[Dict] = []
+        self._pending_source_status: Dict[Tuple[str, str], List[str]] = {}
+
+        # One pooled session for every skip-trace call, so the TCP+TLS connection to
+        # api.batchdata.com is reused instead of re-handshaking per property.
+        # Retries only cover attempts that were never served: connection failures (nothing was
+        # sent) and 429/502/503 responses (honouring Retry-After). Read errors and timeouts are
+        # not retried (read=0, other=0) - the server may already have run, and billed, the lookup.
+        self.session = requests.Session()
+        retry = Retry(
+            total=3,
+            connect=3,
+            read=0,
+            other=0,
+            status=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 502, 503],
+            allowed_methods=["POST"],
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=8, max_retries=retry))
+        self.session.headers.update({
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "Accept": "application/json"
+        })
+
+    def close(self):
+        """Release the pooled BatchData connections."""
+        self.session.close()
         
     def check_daily_usage(self) -> int:
-        """Counts how many BatchData calls were made in the last 24 hours."""
+        """Counts how many BatchData calls were made today (UTC)."""
         today_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
         try:
             response = self.supabase.table("property_owner_enrichment_state") \
@@ -56,7 +199,7 @@ class BatchDataWorker:
                 .execute()
             return response.count or 0
         except Exception as e:
-            logger.error(f"Error checking daily usage: {e}")
+            logger.error("Error checking daily usage: %s", e)
             return 9999 # Safety: assume limit reached on error
 
     def parse_address_string(self, address: str) -> Dict[str, str]:
@@ -66,6 +209,10 @@ class BatchDataWorker:
         """
         if not address:
             return {"street": "", "city": "", "state": "", "zip": ""}
+
+        m = _ADDR_RE.match(address) or _ADDR_NOCOMMA_RE.match(address)
+        if m:
+            return m.groupdict()
         
         result = {"street": "", "city": "", "state": "", "zip": ""}
         
@@ -118,12 +265,6 @@ class BatchDataWorker:
             logger.error("BATCHDATA_API_KEY is missing. Skipping call.")
             return None
             
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-            "Accept": "application/json"
-        }
-        
         addr_parts = self.parse_address_string(address_str)
         
         payload = {
@@ -140,20 +281,78 @@ class BatchDataWorker:
         }
         
         try:
-            logger.info(f"Calling BatchData v1 for: {address_str}")
-            response = requests.post(self.api_url, json=payload, headers=headers, timeout=15)
+            logger.info("Calling BatchData v1 for: %s", address_str)
+            # Body and response go through orjson (Content-Type is set on the session)
+            # (connect, read) timeouts: give up fast when the host is unreachable
+            response = self.session.post(self.api_url, data=orjson.dumps(payload), timeout=(3.05, 12))
             # If 401/403, it's a config error, log critical
             if response.status_code in [401, 403]:
-                logger.critical(f"BatchData Auth Error: {response.text}")
+                logger.critical("BatchData Auth Error: %s", response.text)
                 return None
                 
-            return response.json()
+            return orjson.loads(response.content)
         except Exception as e:
-            logger.error(f"BatchData API v1 error: {e}")
+            logger.error("BatchData API v1 error: %s", e)
             if hasattr(e, 'response') and e.response:
-                logger.error(f"Response body: {e.response.text}")
+                logger.error("Response body: %s", e.response.text)
             return None
 
+    def _acquire_priority_properties(self, priority_source: str, n: int) -> List[Dict]:
+        """
+        Lock up to n pending properties from priority_source.
+        Uses the acquire_priority_locks() RPC (setup_batchdata_worker_functions.sql), which
+        finds and locks in one statement with FOR UPDATE SKIP LOCKED, so two workers can't
+        both grab the same row. Falls back to the two-step select + update if it isn't installed.
+        """
+        if self._priority_lock_rpc_available:
+            try:
+                result = self.supabase.rpc('acquire_priority_locks', {'source': priority_source, 'batch_size': n}).execute()
+                locked = result.data or []
+                if locked:
+                    logger.info("Acquired %d PRIORITY locks for %s", len(locked), priority_source)
+                return locked
+            except Exception as e:
+                if is_missing_function(e):
+                    self._priority_lock_rpc_available = False
+                    logger.warning("acquire_priority_locks RPC unavailable (%s); using select + update. "
+                                   "Run setup_batchdata_worker_functions.sql to enable it.", e)
+                else:
+                    logger.warning("acquire_priority_locks RPC failed (%s); using select + update for this run", e)
+
+        props = []
+        while len(props) < n:
+            prop = self._acquire_priority_property(priority_source)
+            if not prop:
+                break
+            props.append(prop)
+        return props
+
+    def _acquire_priority_property(self, priority_source: str) -> Optional[Dict]:
+        """Fallback: find and lock one pending property from priority_source (None if there is none)."""
+        # We try a semi-atomic approach for the priority source
+        # Find one
+        res = self.supabase.table("property_owner_enrichment_state") \
+            .select("*") \
+            .eq("status", "never_checked") \
+            .eq("locked", False) \
+            .ilike("listing_source", priority_source) \
+            .limit(1) \
+            .execute()
+        
+        if res.data:
+            prop = res.data[0]
+            # Try to lock it specifically
+            lock_res = self.supabase.table("property_owner_enrichment_state") \
+                .update({"locked": True}) \
+                .eq("address_hash", prop['address_hash']) \
+                .eq("locked", False) \
+                .execute()
+            
+            if lock_res.data:
+                logger.info("Acquired PRIORITY lock for %s: %.8s", priority_source, prop['address_hash'])
+                return prop
+        return None
+
     def _acquire_next_property(self, priority_source: Optional[str] = None) -> Optional[Dict]:
         """
         ATOMIC lock acquisition - prevents race conditions.
@@ -162,41 +361,69 @@ class BatchDataWorker:
         try:
             # 1. PRIORITY SOURCE ACQUISITION
             if priority_source:
-                # We try a semi-atomic approach for the priority source
-                # Find one
-                res = self.supabase.table("property_owner_enrichment_state") \
-                    .select("*") \
-                    .eq("status", "never_checked") \
-                    .eq("locked", False) \
-                    .ilike("listing_source", priority_source) \
-                    .limit(1) \
-                    .execute()
-                
-                if res.data:
-                    prop = res.data[0]
-                    # Try to lock it specifically
-                    lock_res = self.supabase.table("property_owner_enrichment_state") \
-                        .update({"locked": True}) \
-                        .eq("address_hash", prop['address_hash']) \
-                        .eq("locked", False) \
-                        .execute()
-                    
-                    if lock_res.data:
-                        logger.info(f"Acquired PRIORITY lock for {priority_source}: {prop['address_hash'][:8]}")
-                        return prop
+                props = self._acquire_priority_properties(priority_source, 1)
+                if props:
+                    return props[0]
 
             # 2. STANDARD ACQUISITION (RPC)
             # Atomically find and lock ONE unlocked property
             result = self.supabase.rpc('acquire_enrichment_lock').execute()
             
             if result.data and len(result.data) > 0:
-                logger.info(f"Acquired lock for {result.data[0]['address_hash'][:8]}")
+                logger.debug("Acquired lock for %.8s", result.data[0]['address_hash'])
                 return result.data[0]
             return None
         except Exception as e:
-            logger.error(f"Error acquiring lock: {e}")
+            logger.error("Error acquiring lock: %s", e)
             return None
 
+    def _acquire_batch(self, n: int, priority_source: Optional[str] = None) -> List[Dict]:
+        """
+        Lock up to n properties for this run.
+        Priority-source properties are claimed first, then the rest come from one
+        acquire_enrichment_locks() RPC call (setup_batchdata_worker_functions.sql).
+        Falls back to one acquire_enrichment_lock() call per property if it isn't installed.
+        """
+        props = []
+        if priority_source:
+            try:
+                props = self._acquire_priority_properties(priority_source, n)
+            except Exception as e:
+                logger.error("Error acquiring priority lock: %s", e)
+
+        if len(props) < n and self._batch_lock_rpc_available:
+            try:
+                result = self.supabase.rpc('acquire_enrichment_locks', {'batch_size': n - len(props)}).execute()
+                locked = result.data or []
+                if locked:
+                    logger.info("Acquired %d locks in one batch", len(locked))
+                return props + locked
+            except Exception as e:
+                if is_missing_function(e):
+                    self._batch_lock_rpc_available = False
+                    logger.warning("acquire_enrichment_locks RPC unavailable (%s); locking one at a time. "
+                                   "Run setup_batchdata_worker_functions.sql to enable it.", e)
+                else:
+                    logger.warning("acquire_enrichment_locks RPC failed (%s); locking one at a time for this run", e)
+
+        while len(props) < n:
+            prop = self._acquire_next_property()
+            if not prop:
+                break
+            props.append(prop)
+        return props
+
+    def _release_locks(self, address_hashes: List[str]):
+        """Unlock properties this run locked but never got to, so the next run can take them."""
+        try:
+            self.supabase.table("property_owner_enrichment_state") \
+                .update({"locked": False}) \
+                .in_("address_hash", address_hashes) \
+                .eq("status", "never_checked") \
+                .execute()
+        except Exception as e:
+            logger.error("Error releasing locks: %s", e)
+
     def clear_stale_locks(self):
         """Unlock any properties that have been locked for more than 15 minutes but not processed."""
         fifteen_mins_ago = (datetime.now(timezone.utc) - timedelta(minutes=15)).isoformat()
@@ -210,9 +437,9 @@ class BatchDataWorker:
                 .execute()
             
             if res.data and len(res.data) > 0:
-                logger.info(f"CLEARED {len(res.data)} stale locks (stuck in 'never_checked').")
+                logger.info("CLEARED %d stale locks (stuck in 'never_checked').", len(res.data))
         except Exception as e:
-            logger.error(f"Error clearing stale locks: {e}")
+            logger.error("Error clearing stale locks: %s", e)
 
     def run_enrichment(self, max_runs: int = 50, priority_source: Optional[str] = None):
         """Main loop to process pending enrichments with PAID-SAFE guarantees."""
@@ -231,54 +458,79 @@ class BatchDataWorker:
         remaining = self.daily_limit - current_usage
         
         if remaining <= 0:
-            logger.warning(f"Daily limit reached ({current_usage}/{self.daily_limit}). "
-                          f"Today's estimated cost: ${current_usage * self.cost_per_call:.2f}")
+            logger.warning("Daily limit reached (%d/%d). Today's estimated cost: $%.2f",
+                           current_usage, self.daily_limit, current_usage * self.cost_per_call)
             return
 
         # Limit runs to remaining quota
         actual_runs = min(max_runs, remaining)
-        logger.info(f"Starting enrichment. Usage: {current_usage}/{self.daily_limit}. "
-                   f"Will process up to {actual_runs} properties.")
+        logger.info("Starting enrichment. Usage: %d/%d. Will process up to %d properties.",
+                    current_usage, self.daily_limit, actual_runs)
+
+        # Lock the whole run's properties up front in one round trip, then process them
+        # BATCHDATA_CONCURRENCY at a time
+        props = self._acquire_batch(actual_runs, priority_source=priority_source)
+        if len(props) < actual_runs:
+            logger.info("No more pending properties to process.")
+
+        deadline = time.monotonic() + self.wall_budget
+        unstarted = []
+
+        def process(prop: Dict) -> bool:
+            if time.monotonic() > deadline:
+                unstarted.append(prop['address_hash'])
+                return False
+            self._process_single_property(prop)
+            return True
 
         processed = 0
-        for _ in range(actual_runs):
-            # Get and lock ONE property atomically
-            prop = self._acquire_next_property(priority_source=priority_source)
-            if not prop:
-                logger.info("No more pending properties to process.")
-                break
-                
-            self._process_single_property(prop)
-            processed += 1
+        try:
+            if props:
+                with ThreadPoolExecutor(max_workers=min(self.concurrency, len(props))) as executor:
+                    processed = sum(executor.map(process, props))
+            if unstarted:
+                logger.warning("Wall budget of %ss reached, stopping. Releasing %d unstarted properties.",
+                               self.wall_budget, len(unstarted))
+                self._release_locks(unstarted)
+        finally:
+            # Terminal states must land even if the run blows up, or these properties would be
+            # unlocked by clear_stale_locks and paid for again
+            self._flush_marks()
             
         # Final summary
         total_cost = (current_usage + processed) * self.cost_per_call
-        logger.info(f"Enrichment complete. Processed: {processed}. "
-                   f"Total API calls today: {current_usage + processed}. "
-                   f"Estimated cost today: ${total_cost:.2f}")
+        logger.info("Enrichment complete. Processed: %d. Total API calls today: %d. Estimated cost today: $%.2f",
+                    processed, current_usage + processed, total_cost)
 
     def _process_single_property(self, prop: Dict):
         """Process one property with proper state management."""
         address_hash = prop['address_hash']
         address = prop.get('normalized_address')
         listing_source = prop.get('listing_source')
+        # Resolve the listing table once; every helper below works on it directly
+        target_table = SOURCE_MAP.get(listing_source.lower()) if listing_source else None
+        if listing_source and not target_table:
+            logger.warning("Unknown source '%s', allowing enrichment", listing_source)
+        # One timestamp for every state write about this property
+        now_iso = _utc_now_iso()
         
-        logger.info(f"Processing: {address} ({address_hash[:8]})")
+        logger.info("Processing: %s (%.8s)", address, address_hash)
         
         # PRE-FLIGHT CHECK: Validate listing still exists in source table
         # This prevents "Ghost" spending on deleted listings
-        if not self._validate_listing_exists(listing_source, address_hash):
-            logger.warning(f"SKIPPING: Listing {address_hash[:8]} not found in {listing_source}. likely deleted.")
-            self._mark_no_data(address_hash, f"Orphaned: Not found in {listing_source}")
+        row = self._fetch_listing_row(target_table, address_hash)
+        if row is None:
+            logger.warning("SKIPPING: Listing %.8s not found in %s. likely deleted.", address_hash, listing_source)
+            self._mark_no_data(address_hash, reason=f"Orphaned: Not found in {listing_source}", checked_at=now_iso)
             return
 
         # SMART SKIP: Check if listing already has owner info (saves money!)
-        existing_owner = self._check_existing_owner_info(listing_source, address_hash)
+        existing_owner = self._existing_owner_info(row)
         if existing_owner:
-            logger.info(f"SMART SKIP: {address_hash[:8]} already has owner '{existing_owner[:30]}...' - No API call needed!")
-            logger.info(f"Smart Skip: {address_hash[:8]} already has owner info: {existing_owner}")
-            self._copy_existing_owner_to_central(listing_source, address_hash)
-            self._mark_enriched_from_scrape(address_hash, listing_source)
+            logger.info("SMART SKIP: %.8s already has owner '%.30s...' - No API call needed!", address_hash, existing_owner)
+            logger.debug("Smart Skip: %.8s already has owner info: %s", address_hash, existing_owner)
+            self._copy_existing_owner_to_central(listing_source, target_table, address_hash, row)
+            self._mark_enriched_from_scrape(address_hash, target_table, checked_at=now_iso)
             return # Changed from 'continue' to 'return' to match original logic of exiting the function for this property.
 
         try:
@@ -291,46 +543,10 @@ class BatchDataWorker:
                 persons_list = results_obj.get('persons', [])
                 
                 if not persons_list:
-                    self._mark_no_data(address_hash, "No persons found in response")
+                    self._mark_no_data(address_hash, reason="No persons found in response", checked_at=now_iso)
                     return
 
-                first_person = persons_list[0]
-                
-                # Check match confidence if available (optional)
-                
-                # Extract Data
-                # Extract Owner Name
-                # Priority 1: property.owner.name
-                # Priority 2: first_person.name
-                full_name = None
-                owner_obj = first_person.get('property', {}).get('owner', {})
-                if owner_obj:
-                    o_name = owner_obj.get('name', {})
-                    if o_name.get('first') or o_name.get('last'):
-                        full_name = f"{o_name.get('first', '')} {o_name.get('last', '')}".strip()
-                
-                if not full_name:
-                    p_name = first_person.get('name', {})
-                    full_name = f"{p_name.get('first', '')} {p_name.get('last', '')}".strip()
-
-                # Extract Mailing Address
-                # Usually under property.owner.mailingAddress
-                mailing_address = None
-                mailing_obj = owner_obj.get('mailingAddress', {})
-                if mailing_obj:
-                    m_street = mailing_obj.get('street', '')
-                    m_city = mailing_obj.get('city', '')
-                    m_state = mailing_obj.get('state', '')
-                    m_zip = mailing_obj.get('zip', '')
-                    if m_street and m_city:
-                        mailing_address = f"{m_street}, {m_city}, {m_state} {m_zip}".strip()
-
-                # Extract Emails and Phones
-                emails = [e.get('email') for e in first_person.get('emails', []) if e.get('email')]
-                phones = [p.get('number') for p in first_person.get('phoneNumbers', []) if p.get('number')] # v1 uses phoneNumbers
-
-                email = emails[0] if emails else None
-                phone = phones[0] if phones else None
+                full_name, email, phone, mailing_address = _extract_owner(persons_list[0])
                 
                 clean_name, clean_email, clean_phone = clean_owner_data(full_name, email, phone)
                 
@@ -348,26 +564,31 @@ class BatchDataWorker:
                         "owner_phone": clean_phone,
                         "mailing_address": mailing_address
                     }
-                    self._save_enriched_data(address_hash, owner_data, result, listing_source)
-                    self._mark_enriched(address_hash, result)
-                    logger.info(f"Enriched: {address_hash[:8]}")
+                    self._save_enriched_data(address_hash, owner_data, result, listing_source, target_table)
+                    self._mark_enriched(address_hash, result, checked_at=now_iso)
+                    logger.info("Enriched: %.8s", address_hash)
                 else:
                     # SUCCESS BUT NO DATA FOUND (after cleaning)
-                    self._mark_no_data(address_hash, listing_source, "No valid contact info or mailing address after cleaning")
+                    self._mark_no_data(address_hash, target_table, "No valid contact info or mailing address after cleaning", checked_at=now_iso)
                     
             else:
                 # API ERROR or no result
                 error_msg = result.get('status', {}).get('text', 'Unknown API error') if result else 'No response from API'
-                self._mark_failed(address_hash, f"API error: {error_msg}")
-                logger.error(f"Enrichment failed: {address_hash[:8]} - {error_msg}")
+                self._mark_failed(address_hash, f"API error: {error_msg}", checked_at=now_iso)
+                logger.error("Enrichment failed: %.8s - %s", address_hash, error_msg)
                 
         except Exception as e:
             # ANY EXCEPTION - Mark as failed (terminal)
             # This is critical for cost safety - do not infinite retry on crash
-            self._mark_failed(address_hash, f"Exception: {str(e)[:200]}")
-            logger.exception(f"Exception processing {address_hash[:8]}")
-
-    def _save_enriched_data(self, address_hash: str, owner_data: Dict, raw_response: Dict, listing_source: str):
+            self._mark_failed(address_hash, f"Exception: {str(e)[:200]}", checked_at=now_iso)
+            logger.exception("Exception processing %.8s", address_hash)
+        finally:
+            # This property has been paid for: write its terminal state now rather than at the
+            # end of the run, so a killed run can't leave it to be requeued and billed again
+            self._flush_marks()
+
+    def _save_enriched_data(self, address_hash: str, owner_data: Dict, raw_response: Dict, listing_source: str,
+                            target_table: Optional[str]):
         # Save to central owner table
         payload = {
             "address_hash": address_hash,
@@ -378,297 +599,225 @@ class BatchDataWorker:
             "source": "batchdata",
             "listing_source": listing_source,
         }
-        self.supabase.table("property_owners").upsert(payload, on_conflict="address_hash").execute()
 
         # SYNC BACK to source listing table if possible
-        try:
-            # Map various source name formats to table names
-            source_lower = listing_source.lower() if listing_source else ""
-            
-            source_map = {
-                'fsbo': 'listings',
-                'forsalebyowner': 'listings',
-                'zillow-fsbo': 'zillow_fsbo_listings',
-                'zillow fsbo': 'zillow_fsbo_listings',
-                'zillow-frbo': 'zillow_frbo_listings',
-                'zillow frbo': 'zillow_frbo_listings',
-                'hotpads': 'hotpads_listings',
-                'apartments': 'apartments_frbo',
-                'apartments.com': 'apartments_frbo',
-                'trulia': 'trulia_listings',
-                'redfin': 'redfin_listings'
+        update_payload = None
+        if target_table:
+            update_payload = {
+                "owner_name": owner_data.get('owner_name')
             }
             
-            target_table = source_map.get(source_lower)
-            if target_table:
-                update_payload = {
-                    "owner_name": owner_data.get('owner_name')
-                }
-                
-                # Only add mailing_address if the table has that column
-                # Based on schema dump:
-                # listings, trulia_listings, redfin_listings have mailing_address
-                if target_table in ['listings', 'trulia_listings', 'redfin_listings']:
-                    update_payload["mailing_address"] = owner_data.get('owner_address') or owner_data.get('mailing_address')
-
-                # Special handling for tables with specific column names or types
-                if target_table == 'listings':
-                    # listings table uses JSONB arrays for emails and phones
-                    if owner_data.get('owner_email'):
-                        update_payload["owner_emails"] = [owner_data.get('owner_email')]
-                    if owner_data.get('owner_phone'):
-                        update_payload["owner_phones"] = [owner_data.get('owner_phone')]
-                
-                elif target_table in ['zillow_fsbo_listings', 'zillow_frbo_listings']:
-                    # These tables use 'phone_number' column and 'owner_email'
-                    if owner_data.get('owner_phone'):
-                        update_payload["phone_number"] = owner_data.get('owner_phone')
-                    if owner_data.get('owner_email'):
-                        update_payload["owner_email"] = owner_data.get('owner_email')
-                
-                elif target_table == 'apartments_frbo':
-                    # Has owner_email, owner_name, and phone_numbers (list)
-                    if owner_data.get('owner_email'):
-                        update_payload["owner_email"] = owner_data.get('owner_email')
-                    if owner_data.get('owner_phone'):
-                        update_payload["phone_numbers"] = [owner_data.get('owner_phone')]
-                
-                elif target_table == 'hotpads_listings':
-                    # Has email, owner_name, owner_phone, phone_number
-                    if owner_data.get('owner_email'):
-                        update_payload["email"] = owner_data.get('owner_email')
-                    if owner_data.get('owner_phone'):
-                        update_payload["owner_phone"] = owner_data.get('owner_phone')
-                        update_payload["phone_number"] = owner_data.get('owner_phone')
-
-                elif target_table in ['trulia_listings', 'redfin_listings']:
-                    # These tables use 'emails' (string/list) and 'phones' (string/list)
-                    if owner_data.get('owner_email'):
-                        update_payload["emails"] = owner_data.get('owner_email')
-                    if owner_data.get('owner_phone'):
-                        update_payload["phones"] = owner_data.get('owner_phone')
-                
-                # Update the source record using address_hash as key
-                update_payload["enrichment_status"] = "enriched"
-                self.supabase.table(target_table).update(update_payload).eq("address_hash", address_hash).execute()
-                logger.info(f"Synced back enriched data to {target_table} for {address_hash[:8]}")
-                
-        except Exception as e:
-            logger.warning(f"Failed to sync back enriched data to {listing_source}: {e}")
-            # Don't fail the whole enrichment if sync-back fails
+            # Only add mailing_address if the table has that column
+            # Based on schema dump:
+            # listings, trulia_listings, redfin_listings have mailing_address
+            if target_table in MAILING_ADDR_TABLES:
+                update_payload["mailing_address"] = owner_data.get('owner_address') or owner_data.get('mailing_address')
+
+            # Email/phone columns differ per table (see SYNC_BACK_COLUMNS)
+            for key, column, as_array in SYNC_BACK_COLUMNS[target_table]:
+                value = owner_data.get(key)
+                if value:
+                    update_payload[column] = [value] if as_array else value
+            
+            update_payload["enrichment_status"] = "enriched"
+
+        # Both writes in one round trip via save_enriched() (setup_batchdata_worker_functions.sql)
+        if self._save_rpc_available:
+            try:
+                result = self.supabase.rpc('save_enriched', {
+                    'owner': payload,
+                    'target_table': target_table,
+                    'listing_update': update_payload
+                }).execute()
+                if target_table:
+                    if result.data is False:
+                        # Don't fail the whole enrichment if sync-back fails (the function logs why)
+                        logger.warning("Failed to sync back enriched data to %s", listing_source)
+                    else:
+                        logger.debug("Synced back enriched data to %s for %.8s", target_table, address_hash)
+                return
+            except Exception as e:
+                if is_missing_function(e):
+                    self._save_rpc_available = False
+                    logger.warning("save_enriched RPC unavailable (%s); saving with separate requests. "
+                                   "Run setup_batchdata_worker_functions.sql to enable it.", e)
+                else:
+                    logger.warning("save_enriched RPC failed (%s); saving %.8s with separate requests", e, address_hash)
 
-    def _update_source_status(self, address_hash: str, listing_source: str, status: str):
-        """Helper to update enrichment_status in the original listing table."""
-        if not listing_source:
-            return
+        self.supabase.table("property_owners").upsert(payload, on_conflict="address_hash").execute()
 
-        source_lower = listing_source.lower()
-        source_map = {
-            'fsbo': 'listings',
-            'forsalebyowner': 'listings',
-            'zillow-fsbo': 'zillow_fsbo_listings',
-            'zillow fsbo': 'zillow_fsbo_listings',
-            'zillow-frbo': 'zillow_frbo_listings',
-            'zillow frbo': 'zillow_frbo_listings',
-            'hotpads': 'hotpads_listings',
-            'apartments': 'apartments_frbo',
-            'apartments.com': 'apartments_frbo',
-            'trulia': 'trulia_listings',
-            'redfin': 'redfin_listings'
-        }
+        if target_table:
+            try:
+                # Update the source record using address_hash as key
+                self.supabase.table(target_table).update(update_payload).eq("address_hash", address_hash).execute()
+                logger.debug("Synced back enriched data to %s for %.8s", target_table, address_hash)
+            except Exception as e:
+                logger.warning("Failed to sync back enriched data to %s: %s", listing_source, e)
+                # Don't fail the whole enrichment if sync-back fails
 
-        target_table = source_map.get(source_lower)
-        if not target_table:
-            return
+    def _update_source_status(self, address_hash: str, target_table: str, status: str):
+        """Helper to queue an enrichment_status update for the original listing table."""
+        with self._state_lock:
+            self._pending_source_status.setdefault((target_table, status), []).append(address_hash)
 
-        try:
-            self.supabase.table(target_table).update({"enrichment_status": status}).eq("address_hash", address_hash).execute()
-        except Exception as e:
-            logger.warning(f"Failed to update source status for {listing_source}: {e}")
+    def _queue_mark(self, address_hash: str, fields: Dict):
+        with self._state_lock:
+            self._pending_marks.append({"address_hash": address_hash, **fields})
 
-    def _mark_enriched(self, address_hash: str, raw_response: Dict):
+    def _flush_marks(self):
+        """
+        Write all queued state marks in one apply_enrichment_marks() RPC call
+        (setup_batchdata_worker_functions.sql), falling back to one UPDATE per property,
+        then the source-table statuses with one UPDATE per table and status.
+        """
+        with self._state_lock:
+            marks, self._pending_marks = self._pending_marks, []
+            source_status, self._pending_source_status = self._pending_source_status, {}
+
+        if marks and self._marks_rpc_available:
+            try:
+                self.supabase.rpc('apply_enrichment_marks', {'marks': marks}).execute()
+                marks = []
+            except Exception as e:
+                if is_missing_function(e):
+                    self._marks_rpc_available = False
+                    logger.warning("apply_enrichment_marks RPC unavailable (%s); updating one property at a time. "
+                                   "Run setup_batchdata_worker_functions.sql to enable it.", e)
+                else:
+                    logger.warning("apply_enrichment_marks RPC failed (%s); updating these marks one property at a time", e)
+        for mark in marks:
+            fields = {k: v for k, v in mark.items() if k != "address_hash"}
+            try:
+                self.supabase.table("property_owner_enrichment_state").update(fields).eq("address_hash", mark["address_hash"]).execute()
+            except Exception as e:
+                logger.error("Failed to mark %.8s as %s: %s", mark['address_hash'], fields['status'], e)
+
+        for (target_table, status), hashes in source_status.items():
+            try:
+                self.supabase.table(target_table).update({"enrichment_status": status}).in_("address_hash", hashes).execute()
+            except Exception as e:
+                logger.warning("Failed to update source status in %s: %s", target_table, e)
+
+    def _mark_enriched(self, address_hash: str, raw_response: Dict, checked_at: Optional[str] = None):
         req_id = raw_response.get('results', {}).get('meta', {}).get('requestId')
-        self.supabase.table("property_owner_enrichment_state").update({
+        self._queue_mark(address_hash, {
             "status": "enriched",
             "locked": True,
-            "checked_at": datetime.now(timezone.utc).isoformat(),
+            "checked_at": checked_at or _utc_now_iso(),
             "source_used": "batchdata",
             "batchdata_request_id": req_id
-        }).eq("address_hash", address_hash).execute()
+        })
 
-    def _mark_no_data(self, address_hash: str, listing_source: str = None, reason: str = "No data"):
+    def _mark_no_data(self, address_hash: str, target_table: Optional[str] = None, reason: str = "No data",
+                      checked_at: Optional[str] = None):
         """Terminal state for no data found"""
-        self.supabase.table("property_owner_enrichment_state").update({
+        self._queue_mark(address_hash, {
             "status": "no_owner_data",
             "locked": True,
             "failure_reason": reason,
-            "checked_at": datetime.now(timezone.utc).isoformat(),
+            "checked_at": checked_at or _utc_now_iso(),
             "source_used": "batchdata"
-        }).eq("address_hash", address_hash).execute()
+        })
         
-        if listing_source:
-            self._update_source_status(address_hash, listing_source, "no_owner_data")
+        if target_table:
+            self._update_source_status(address_hash, target_table, "no_owner_data")
 
-    def _mark_failed(self, address_hash: str, reason: str):
+    def _mark_failed(self, address_hash: str, reason: str, checked_at: Optional[str] = None):
         """
         TERMINAL STATE - Property will NEVER be retried.
         This is critical for cost safety.
         """
-        self.supabase.table("property_owner_enrichment_state").update({
+        self._queue_mark(address_hash, {
             "status": "failed",  # TERMINAL - no retry
             "locked": False, # Technically false so we could inspect it, but status 'failed' prevents pickup
             "failure_reason": reason[:500],
             "source_used": "batchdata",
-            "checked_at": datetime.now().isoformat()
-        }).eq("address_hash", address_hash).execute()
-        logger.warning(f"TERMINAL FAIL: {address_hash[:8]} - {reason}")
+            "checked_at": checked_at or _utc_now_iso()
+        })
+        logger.warning("TERMINAL FAIL: %.8s - %s", address_hash, reason)
 
-    def _validate_listing_exists(self, listing_source: str, address_hash: str) -> bool:
+    def _fetch_listing_row(self, target_table: Optional[str], address_hash: str) -> Optional[Dict]:
         """
-        PRE-FLIGHT CHECK: Verify listing still exists in source table.
-        Returns True if listing exists, False if orphaned.
-        This prevents wasting money on deleted listings.
+        PRE-FLIGHT CHECK + SMART SKIP lookup in one round trip.
+        Reads the listing's owner columns from its source table.
+        Returns None if the listing is gone (orphaned), otherwise the row - an empty dict
+        when the source is unknown or the lookup failed, so enrichment goes ahead (fail-safe).
         """
-        if not listing_source:
-            return True  # Unknown source, allow to proceed
-            
-        source_lower = listing_source.lower()
-        source_map = {
-            'fsbo': 'listings',
-            'forsalebyowner': 'listings',
-            'zillow-fsbo': 'zillow_fsbo_listings',
-            'zillow fsbo': 'zillow_fsbo_listings',
-            'zillow-frbo': 'zillow_frbo_listings',
-            'zillow frbo': 'zillow_frbo_listings',
-            'hotpads': 'hotpads_listings',
-            'apartments': 'apartments_frbo',
-            'apartments.com': 'apartments_frbo',
-            'trulia': 'trulia_listings',
-            'redfin': 'redfin_listings'
-        }
-        
-        target_table = source_map.get(source_lower)
         if not target_table:
-            logger.warning(f"Unknown source '{listing_source}', allowing enrichment")
-            return True
+            return {}  # Unknown source, allow to proceed
             
+        cols = OWNER_COLUMNS[target_table]
+        
         try:
             result = self.supabase.table(target_table) \
-                .select("id") \
+                .select("id," + ",".join(cols)) \
                 .eq("address_hash", address_hash) \
                 .limit(1) \
                 .execute()
-            
-            exists = len(result.data) > 0
-            if not exists:
-                logger.info(f"Pre-flight check: {address_hash[:8]} NOT FOUND in {target_table}")
-            return exists
         except Exception as e:
-            logger.error(f"Pre-flight check error: {e}")
-            return True  # On error, allow to proceed (fail-safe)
+            # Owner columns unreadable - still do the existence check, just without smart skip
+            logger.error("Aggressive smart skip check error: %s", e)
+            try:
+                result = self.supabase.table(target_table) \
+                    .select("id") \
+                    .eq("address_hash", address_hash) \
+                    .limit(1) \
+                    .execute()
+            except Exception as e:
+                logger.error("Pre-flight check error: %s", e)
+                return {}  # On error, allow to proceed (fail-safe)
+
+        if not result.data:
+            logger.debug("Pre-flight check: %.8s NOT FOUND in %s", address_hash, target_table)
+            return None
+        return result.data[0]
 
-    def _check_existing_owner_info(self, listing_source: str, address_hash: str) -> Optional[str]:
+    def _existing_owner_info(self, row: Dict) -> Optional[str]:
         """
-        SMART SKIP: Check if source table already has ANY valid owner info (name, email, or phone).
+        SMART SKIP: Check if the listing row already has ANY valid owner info (name, email, or phone).
         Returns owner_name if found and valid, otherwise "Existing Contact Info" if email/phone found, 
         or None if no valid info exists.
         """
-        if not listing_source:
-            return None
-            
-        source_lower = listing_source.lower()
-        source_map = {
-            'fsbo': ('listings', ['owner_name', 'owner_emails', 'owner_phones']),
-            'forsalebyowner': ('listings', ['owner_name', 'owner_emails', 'owner_phones']),
-            'zillow-fsbo': ('zillow_fsbo_listings', ['owner_name', 'owner_email', 'phone_number']),
-            'zillow fsbo': ('zillow_fsbo_listings', ['owner_name', 'owner_email', 'phone_number']),
-            'zillow-frbo': ('zillow_frbo_listings', ['owner_name', 'owner_email', 'phone_number']),
-            'zillow frbo': ('zillow_frbo_listings', ['owner_name', 'owner_email', 'phone_number']),
-            'hotpads': ('hotpads_listings', ['owner_name', 'email', 'owner_phone', 'phone_number']),
-            'apartments': ('apartments_frbo', ['owner_name', 'owner_email', 'phone_numbers']),
-            'apartments.com': ('apartments_frbo', ['owner_name', 'owner_email', 'phone_numbers']),
-            'trulia': ('trulia_listings', ['owner_name', 'emails', 'phones']),
-            'redfin': ('redfin_listings', ['owner_name', 'emails', 'phones'])
-        }
+        # Check for ANY valid data in the owner columns
+        # We consider info "valid" if it's not empty, null, or a placeholder
+        found_name = None
+        has_any_contact = False
         
-        table_info = source_map.get(source_lower)
-        if not table_info:
-            return None
-            
-        target_table, cols = table_info
+        for col, val in row.items():
+            if col != 'id' and val:
+                # Normalize value for checking
+                check_val = str(val).strip().lower()
+                if check_val not in _INVALID_OWNER_VALUES:
+                    if 'name' in col:
+                        found_name = val
+                    has_any_contact = True
         
-        try:
-            # Select all relevant columns at once
-            result = self.supabase.table(target_table) \
-                .select(",".join(cols)) \
-                .eq("address_hash", address_hash) \
-                .limit(1) \
-                .execute()
-            
-            if result.data:
-                row = result.data[0]
-                # Check for ANY valid data in specified columns
-                # We consider info "valid" if it's not empty, null, or a placeholder
-                placeholders = ['n/a', 'unknown', 'none', '', '[]', '{}']
-                
-                found_name = None
-                has_any_contact = False
-                
-                for col in cols:
-                    val = row.get(col)
-                    if val:
-                        # Normalize value for checking
-                        check_val = str(val).strip().lower()
-                        if check_val not in placeholders:
-                            if 'name' in col:
-                                found_name = val
-                            has_any_contact = True
-                
-                if has_any_contact:
-                    return found_name or "Existing Contact Info"
-                    
-            return None
-        except Exception as e:
-            logger.error(f"Aggressive smart skip check error: {e}")
-            return None
+        if has_any_contact:
+            return found_name or "Existing Contact Info"
+        return None
 
-    def _copy_existing_owner_to_central(self, listing_source: str, address_hash: str):
+    def _copy_existing_owner_to_central(self, listing_source: str, target_table: Optional[str], address_hash: str,
+                                        row: Optional[Dict] = None):
         """
         Copy existing owner info from source table to central property_owners table.
+        Pass the already-fetched listing row to skip reading it again.
         """
-        source_lower = listing_source.lower() if listing_source else ""
-        
-        # Map sources to tables and their column names
-        source_map = {
-            'fsbo': 'listings',
-            'forsalebyowner': 'listings',
-            'zillow-fsbo': 'zillow_fsbo_listings',
-            'zillow fsbo': 'zillow_fsbo_listings',
-            'zillow-frbo': 'zillow_frbo_listings',
-            'zillow frbo': 'zillow_frbo_listings',
-            'hotpads': 'hotpads_listings',
-            'apartments': 'apartments_frbo',
-            'apartments.com': 'apartments_frbo',
-            'trulia': 'trulia_listings',
-            'redfin': 'redfin_listings'
-        }
-        
-        target_table = source_map.get(source_lower)
         if not target_table:
             return
             
         try:
-            # Fetch existing owner data from source
-            result = self.supabase.table(target_table) \
-                .select("*") \
-                .eq("address_hash", address_hash) \
-                .limit(1) \
-                .execute()
-            
-            if not result.data:
-                return
+            if row is None:
+                # Fetch existing owner data from source (just the owner columns, not the whole listing)
+                result = self.supabase.table(target_table) \
+                    .select(",".join(OWNER_COLUMNS[target_table])) \
+                    .eq("address_hash", address_hash) \
+                    .limit(1) \
+                    .execute()
                 
-            row = result.data[0]
+                if not result.data:
+                    return
+                    
+                row = result.data[0]
             
             # Extract owner info based on table structure
             owner_name = row.get('owner_name')
@@ -694,22 +843,23 @@ class BatchDataWorker:
                 "listing_source": listing_source
             }
             self.supabase.table("property_owners").upsert(payload, on_conflict="address_hash").execute()
-            logger.info(f"Copied existing owner to central: {address_hash[:8]}")
+            logger.debug("Copied existing owner to central: %.8s", address_hash)
             
         except Exception as e:
-            logger.error(f"Error copying existing owner: {e}")
+            logger.error("Error copying existing owner: %s", e)
 
-    def _mark_enriched_from_scrape(self, address_hash: str, listing_source: str = None):
+    def _mark_enriched_from_scrape(self, address_hash: str, target_table: Optional[str] = None,
+                                   checked_at: Optional[str] = None):
         """Mark as enriched but note that data came from original scrape, not API."""
-        self.supabase.table("property_owner_enrichment_state").update({
+        self._queue_mark(address_hash, {
             "status": "enriched",
             "locked": True,
-            "checked_at": datetime.now(timezone.utc).isoformat(),
+            "checked_at": checked_at or _utc_now_iso(),
             "source_used": "scraped"  # Different from 'batchdata' - indicates no API cost
-        }).eq("address_hash", address_hash).execute()
+        })
         
-        if listing_source:
-            self._update_source_status(address_hash, listing_source, "enriched")
+        if target_table:
+            self._update_source_status(address_hash, target_table, "enriched")
 
     def _run_dry_mode(self):
         """
@@ -731,9 +881,9 @@ class BatchDataWorker:
         count = result.count
         estimated_cost = count * self.cost_per_call
         
-        logger.info(f"\nEligible properties for enrichment: {count}")
-        logger.info(f"Estimated cost if processed: ${estimated_cost:.2f}")
-        logger.info(f"Cost per call: ${self.cost_per_call}")
+        logger.info("\nEligible properties for enrichment: %s", count)
+        logger.info("Estimated cost if processed: $%.2f", estimated_cost)
+        logger.info("Cost per call: $%s", self.cost_per_call)
         
         if count > 0:
             logger.info("\nSample of eligible properties:")
@@ -747,10 +897,10 @@ class BatchDataWorker:
                 
             sample = sample_res.data or []
             for i, prop in enumerate(sample):
-                logger.info(f"  {i+1}. {prop['address_hash'][:16]}... | {prop.get('listing_source', 'Unknown')} | {prop['normalized_address'][:50]}...")
+                logger.info("  %d. %.16s... | %s | %.50s...", i + 1, prop['address_hash'], prop.get('listing_source', 'Unknown'), prop['normalized_address'])
             
             if count > 10:
-                logger.info(f"  ... and {count - 10} more")
+                logger.info("  ... and %d more", count - 10)
         
         logger.info("=" * 60)
         logger.info("DRY RUN COMPLETE - No changes made")
@@ -764,4 +914,15 @@ if __name__ == "__main__":
     args = parser.parse_args()
 
     worker = BatchDataWorker()
-    worker.run_enrichment(max_runs=args.limit, priority_source=args.source)
+
+    def _on_sigterm(signum, frame):
+        # /api/stop-scraper sends SIGTERM and follows with SIGKILL shortly after: save what we have
+        logger.warning("SIGTERM received, saving pending results before exiting.")
+        worker._flush_marks()
+        raise SystemExit(128 + signum)
+
+    signal.signal(signal.SIGTERM, _on_sigterm)
+    try:
+        worker.run_enrichment(max_runs=args.limit, priority_source=args.source)
+    finally:
+        worker.close()
@@ -27,21 +27,23 @@ try:
     print("Checking current state of listings table")
     print("=" * 70)
     
+    # Fetch all the IDs we care about in one query
+    result = supabase.table("listings").select("id, address").in_("id", [1026, 1027, 1028, 134, 135, 136]).execute()
+    found = {record['id']: record for record in result.data or []}
+    
     # Check for IDs 1026, 1027, 1028
     print("\n1. Checking for records with IDs 1026, 1027, 1028...")
     for check_id in [1026, 1027, 1028]:
-        result = supabase.table("listings").select("*").eq("id", check_id).execute()
-        if result.data and len(result.data) > 0:
-            print(f"   [FOUND] ID {check_id}: {result.data[0].get('address', 'N/A')[:50]}")
+        if check_id in found:
+            print(f"   [FOUND] ID {check_id}: {found[check_id].get('address', 'N/A')[:50]}")
         else:
             print(f"   [NOT FOUND] ID {check_id}")
     
     # Check for IDs 134, 135, 136
     print("\n2. Checking for records with IDs 134, 135, 136...")
     for check_id in [134, 135, 136]:
-        result = supabase.table("listings").select("*").eq("id", check_id).execute()
-        if result.data and len(result.data) > 0:
-            print(f"   [FOUND] ID {check_id}: {result.data[0].get('address', 'N/A')[:50]}")
+        if check_id in found:
+            print(f"   [FOUND] ID {check_id}: {found[check_id].get('address', 'N/A')[:50]}")
         else:
             print(f"   [AVAILABLE] ID {check_id}")
     
@@ -62,10 +64,16 @@ try:
         "5338 South Wabash Avenue"
     ]
     
-    for address in addresses_to_find:
-        result = supabase.table("listings").select("id, address, listing_link").ilike("address", f"%{address.split()[0]}%").limit(5).execute()
-        if result.data:
-            for record in result.data:
+    # One query for all three: address contains any of the house numbers
+    house_numbers = [address.split()[0] for address in addresses_to_find]
+    result = supabase.table("listings").select("id, address, listing_link") \
+        .or_(",".join(f"address.ilike.%{number}%" for number in house_numbers)).execute()
+    candidates = result.data or []
+    
+    for address, number in zip(addresses_to_find, house_numbers):
+        matches = [record for record in candidates if number.lower() in (record.get('address') or '').lower()][:5]
+        if matches:
+            for record in matches:
                 if any(addr_part in record.get('address', '') for addr_part in address.split()[:3]):
                     print(f"   [FOUND] {record.get('address', 'N/A')[:50]} - ID: {record['id']}")
                     break
@@ -0,0 +1,30 @@
+"""
+Gunicorn settings for api_server:app (used by the Dockerfile)
+Run with: gunicorn -c gunicorn.conf.py api_server:app
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+
+# One worker process: scraper status, the log buffer and the running scraper processes live in
+# api_server's memory, so a second worker would have its own copy and report different state.
+# Concurrency comes from threads instead - long-lived /api/logs/stream and /api/events
+# connections each hold one, so the pool is the stream cap (api_server refuses streams past
+# SSE_MAX_CLIENTS with a 503) plus 8 threads that only regular requests can use.
+workers = 1
+worker_class = "gthread"
+threads = int(os.environ.get("SSE_MAX_CLIENTS", "4")) + 8
+
+timeout = 120
+keepalive = 5
+
+# Not preloaded: api_server starts its log writer and process loop threads at import, and threads
+# don't survive the fork from the master into the worker.
+preload_app = False
+
+
+def post_worker_init(worker):
+    """Start the daily all-scrapers schedule in the worker (python api_server.py does this in __main__)"""
+    from api_server import start_scheduler
+    start_scheduler()
@@ -25,6 +25,7 @@ def run_test():
     # Run for exactly 5 listings
     print("🔄 Running enrichment loop (max 5)...")
     worker.run_enrichment(max_runs=5)
+    worker.close()
     
     print("\n🔍 Verifying results (checking last 5 enriched items)...")
     
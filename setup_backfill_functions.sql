@@ -0,0 +1,101 @@
+-- SQL Script to set up the functions and views used by backfill_enrichment_queue.py
+-- Each function call applies a whole page of changes in one statement, so the backfill makes
+-- one round trip per page instead of one UPDATE request per row.
+-- Until these are installed, the backfill falls back to updating rows one at a time
+-- (and to checking property_owners completeness in Python).
+--
+-- Run this in Supabase SQL Editor (Dashboard > SQL Editor)
+
+-- Set address_hash on many rows of one listing table
+-- pairs: [{"id": 123, "address_hash": "..."}, ...]
+CREATE OR REPLACE FUNCTION bulk_update_address_hash(table_name TEXT, pairs JSONB)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    updated INTEGER;
+BEGIN
+    -- The table name is spliced into dynamic SQL, so only accept the listing tables
+    IF table_name NOT IN (
+        'listings', 'zillow_fsbo_listings', 'zillow_frbo_listings', 'hotpads_listings',
+        'apartments_frbo', 'trulia_listings', 'redfin_listings', 'other_listings'
+    ) THEN
+        RAISE EXCEPTION 'bulk_update_address_hash: unknown listing table %', table_name;
+    END IF;
+
+    EXECUTE format(
+        'UPDATE %I AS t SET address_hash = r.address_hash
+         FROM jsonb_to_recordset($1) AS r(id BIGINT, address_hash TEXT)
+         WHERE t.id = r.id AND t.address_hash IS DISTINCT FROM r.address_hash',
+        table_name
+    ) USING pairs;
+
+    GET DIAGNOSTICS updated = ROW_COUNT;
+    RETURN updated;
+END;
+$$;
+
+-- Fill original_address on already-queued enrichment rows that don't have one yet
+-- rows: [{"address_hash": "...", "original_address": "..."}, ...]
+CREATE OR REPLACE FUNCTION fill_missing_original_address(rows JSONB)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    updated INTEGER;
+BEGIN
+    UPDATE property_owner_enrichment_state AS s
+    SET original_address = r.original_address
+    FROM jsonb_to_recordset(rows) AS r(address_hash TEXT, original_address TEXT)
+    WHERE s.address_hash = r.address_hash
+      AND s.original_address IS NULL;
+
+    GET DIAGNOSTICS updated = ROW_COUNT;
+    RETURN updated;
+END;
+$$;
+
+-- property_owners rows whose owner data is COMPLETE, mirroring is_owner_data_complete() in
+-- utils/placeholder_utils.py: name, email and phone present and not platform placeholders,
+-- plus a mailing address. Keep the two in sync.
+CREATE OR REPLACE VIEW property_owners_complete_v AS
+SELECT id, address_hash
+FROM property_owners
+WHERE
+    -- Name: not a generic placeholder
+    owner_name IS NOT NULL AND owner_name <> ''
+    AND lower(btrim(owner_name, E' \t\n\r\f')) NOT IN (
+        'support', 'admin', 'hotpads support', 'listing agent', 'property manager',
+        'leasing office', 'null', 'none'
+    )
+    -- Email: not on a listing platform's domain (covers the known placeholder addresses)
+    AND owner_email IS NOT NULL AND owner_email <> ''
+    AND lower(btrim(owner_email, E' \t\n\r\f'))
+        !~ '@(hotpads\.com|zillow\.com|trulia\.com|apartments\.com|redfin\.com|streetlines\.com)$'
+    -- Phone: not one repeated digit and not a known fake number
+    AND owner_phone IS NOT NULL AND owner_phone::TEXT <> ''
+    AND regexp_replace(owner_phone::TEXT, '\D', '', 'g') !~ '^(\d)\1{9,}$'
+    AND owner_phone::TEXT !~ '000-000-0000|111-111-1111|123-456-7890|\(800\) 000-0000'
+    -- Mailing address present
+    AND mailing_address IS NOT NULL
+    AND btrim(mailing_address, E' \t\n\r\f') <> ''
+    AND lower(mailing_address) NOT IN ('null', 'none');
+
+-- For each hash in a page of listings: is it already in the enrichment queue, and does
+-- property_owners already hold complete owner data for it?
+-- Lets the backfill do this anti-join per page instead of downloading both tables first.
+CREATE OR REPLACE FUNCTION lookup_address_hashes(hashes TEXT[])
+RETURNS TABLE(address_hash TEXT, queued BOOLEAN, complete BOOLEAN)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        h.address_hash,
+        EXISTS (SELECT 1 FROM property_owner_enrichment_state s WHERE s.address_hash = h.address_hash),
+        EXISTS (SELECT 1 FROM property_owners_complete_v c WHERE c.address_hash = h.address_hash)
+    FROM unnest(hashes) AS h(address_hash);
+$$;
+
+-- Verify the functions and view exist
+SELECT proname FROM pg_proc WHERE proname IN ('bulk_update_address_hash', 'fill_missing_original_address', 'lookup_address_hashes');
+SELECT COUNT(*) FROM property_owners_complete_v;
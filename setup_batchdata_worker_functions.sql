@@ -0,0 +1,144 @@
+-- SQL Script to set up the functions used by batchdata_worker.py
+-- acquire_enrichment_locks() claims a whole run's worth of queued properties in one round trip
+-- instead of one acquire_enrichment_lock() call per property, and acquire_priority_locks() does
+-- the same for a --source run in one atomic statement (no select-then-update race).
+-- apply_enrichment_marks() writes the run's terminal states in one round trip at the end, and
+-- save_enriched() stores a BatchData result in property_owners and its listing table in one call.
+-- Until these are installed, the worker falls back to one request per property.
+--
+-- Run this in Supabase SQL Editor (Dashboard > SQL Editor)
+
+-- Atomically lock and return up to batch_size pending properties.
+-- FOR UPDATE SKIP LOCKED lets concurrent workers call this at the same time without
+-- handing out the same row twice (a row being claimed by another worker is simply skipped).
+CREATE OR REPLACE FUNCTION acquire_enrichment_locks(batch_size INTEGER)
+RETURNS SETOF property_owner_enrichment_state
+LANGUAGE sql
+AS $$
+    UPDATE property_owner_enrichment_state AS s
+    SET locked = TRUE,
+        updated_at = now()
+    WHERE s.id IN (
+        SELECT id
+        FROM property_owner_enrichment_state
+        WHERE status = 'never_checked' AND locked = FALSE
+        ORDER BY id
+        LIMIT batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING s.*;
+$$;
+
+-- Same, limited to one listing_source (matched case-insensitively, like the worker's --source)
+CREATE OR REPLACE FUNCTION acquire_priority_locks(source TEXT, batch_size INTEGER)
+RETURNS SETOF property_owner_enrichment_state
+LANGUAGE sql
+AS $$
+    UPDATE property_owner_enrichment_state AS s
+    SET locked = TRUE,
+        updated_at = now()
+    WHERE s.id IN (
+        SELECT id
+        FROM property_owner_enrichment_state
+        WHERE status = 'never_checked' AND locked = FALSE
+          AND lower(listing_source) = lower(source)
+        ORDER BY id
+        LIMIT batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING s.*;
+$$;
+
+-- Apply a run's terminal state marks (enriched / no_owner_data / failed) in one statement
+-- marks: [{"address_hash": "...", "status": "...", "locked": true, "checked_at": "...",
+--          "source_used": "...", "failure_reason": "...", "batchdata_request_id": "..."}, ...]
+-- failure_reason and batchdata_request_id are optional and left unchanged when absent.
+CREATE OR REPLACE FUNCTION apply_enrichment_marks(marks JSONB)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    updated INTEGER;
+BEGIN
+    UPDATE property_owner_enrichment_state AS s
+    SET status = m.status,
+        locked = m.locked,
+        checked_at = m.checked_at,
+        source_used = m.source_used,
+        failure_reason = COALESCE(m.failure_reason, s.failure_reason),
+        batchdata_request_id = COALESCE(m.batchdata_request_id, s.batchdata_request_id)
+    FROM jsonb_to_recordset(marks) AS m(
+        address_hash TEXT, status TEXT, locked BOOLEAN, checked_at TIMESTAMPTZ,
+        source_used TEXT, failure_reason TEXT, batchdata_request_id TEXT
+    )
+    WHERE s.address_hash = m.address_hash;
+
+    GET DIAGNOSTICS updated = ROW_COUNT;
+    RETURN updated;
+END;
+$$;
+
+-- Save one enriched property: upsert its property_owners row, then copy the owner data back
+-- to the listing it came from.
+-- owner: the property_owners row (address_hash, owner_name, owner_email, owner_phone,
+--        mailing_address, source, listing_source)
+-- target_table / listing_update: the listing table and the {column: value} update for it
+--        (NULL when the source has no known table)
+-- The sync-back is best-effort like in the worker: if it fails (e.g. a column the table lacks)
+-- only that part is rolled back, the owner row is kept and the function returns FALSE.
+CREATE OR REPLACE FUNCTION save_enriched(owner JSONB, target_table TEXT, listing_update JSONB)
+RETURNS BOOLEAN
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    set_cols TEXT;
+BEGIN
+    INSERT INTO property_owners (address_hash, owner_name, owner_email, owner_phone, mailing_address, source, listing_source)
+    SELECT address_hash, owner_name, owner_email, owner_phone, mailing_address, source, listing_source
+    FROM jsonb_populate_record(NULL::property_owners, owner)
+    ON CONFLICT (address_hash) DO UPDATE SET
+        owner_name = EXCLUDED.owner_name,
+        owner_email = EXCLUDED.owner_email,
+        owner_phone = EXCLUDED.owner_phone,
+        mailing_address = EXCLUDED.mailing_address,
+        source = EXCLUDED.source,
+        listing_source = EXCLUDED.listing_source;
+
+    IF target_table IS NULL OR listing_update IS NULL THEN
+        RETURN TRUE;
+    END IF;
+
+    -- The table name is spliced into dynamic SQL, so only accept the listing tables
+    IF target_table NOT IN (
+        'listings', 'zillow_fsbo_listings', 'zillow_frbo_listings', 'hotpads_listings',
+        'apartments_frbo', 'trulia_listings', 'redfin_listings', 'other_listings'
+    ) THEN
+        RAISE EXCEPTION 'save_enriched: unknown listing table %', target_table;
+    END IF;
+
+    BEGIN
+        -- SET col = r.col for each key, with values cast through the table's own row type
+        SELECT string_agg(format('%I = r.%I', k, k), ', ')
+        INTO set_cols
+        FROM jsonb_object_keys(listing_update) AS k;
+
+        EXECUTE format(
+            'UPDATE %I AS t SET %s FROM jsonb_populate_record(NULL::%I, $1) AS r WHERE t.address_hash = $2',
+            target_table, set_cols, target_table
+        ) USING listing_update, owner->>'address_hash';
+    EXCEPTION WHEN OTHERS THEN
+        RAISE WARNING 'save_enriched: sync-back to % failed: %', target_table, SQLERRM;
+        RETURN FALSE;
+    END;
+
+    RETURN TRUE;
+END;
+$$;
+
+-- Today's paid-call count (check_daily_usage) filters on source_used + checked_at;
+-- without this it is a sequential scan of the whole queue
+CREATE INDEX IF NOT EXISTS idx_enrichment_state_source_checked
+    ON property_owner_enrichment_state (source_used, checked_at);
+
+-- Verify the functions exist
+SELECT proname FROM pg_proc WHERE proname IN ('acquire_enrichment_locks', 'acquire_priority_locks', 'apply_enrichment_marks', 'save_enriched');
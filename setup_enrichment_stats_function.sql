@@ -0,0 +1,35 @@
+-- SQL Script to set up the enrichment_stats_v1() function used by /api/enrichment-stats
+-- Returns all dashboard counts in one row, so the API makes a single round trip
+-- (one pass over property_owner_enrichment_state instead of five separate COUNT queries).
+-- Until this is installed, the API falls back to issuing the individual count queries.
+--
+-- Run this in Supabase SQL Editor (Dashboard > SQL Editor)
+
+CREATE OR REPLACE FUNCTION enrichment_stats_v1()
+RETURNS TABLE(
+    pending BIGINT,
+    enriched BIGINT,
+    no_data BIGINT,
+    scraped BIGINT,
+    batchdata BIGINT,
+    owners BIGINT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        -- Queue waiting to be processed
+        COUNT(*) FILTER (WHERE status = 'never_checked' AND locked = FALSE),
+        COUNT(*) FILTER (WHERE status = 'enriched'),
+        COUNT(*) FILTER (WHERE status = 'no_owner_data'),
+        -- Smart skips (owner data already scraped from the listing)
+        COUNT(*) FILTER (WHERE source_used = 'scraped'),
+        -- Only count ACTUAL paid API calls (exclude buggy never_checked entries)
+        COUNT(*) FILTER (WHERE source_used = 'batchdata' AND status <> 'never_checked'),
+        -- property_owners is the source of truth for addresses with owner data
+        (SELECT COUNT(*) FROM property_owners)
+    FROM property_owner_enrichment_state;
+$$;
+
+-- Verify the function works
+SELECT * FROM enrichment_stats_v1();
@@ -1,6 +1,57 @@
 import re
 import hashlib
+import functools
 
+# Patterns are compiled once at import; normalize_address runs for every listing row
+_PUNCTUATION_RE = re.compile(r'[.,#\-]')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Common Suffix Abbreviations
+SUFFIXES = {
+    'STREET': 'ST',
+    'AVENUE': 'AVE',
+    'BOULEVARD': 'BLVD',
+    'DRIVE': 'DR',
+    'LANE': 'LN',
+    'COURT': 'CT',
+    'ROAD': 'RD',
+    'PLACE': 'PL',
+    'SQUARE': 'SQ',
+    'TERRACE': 'TER',
+    'PARKWAY': 'PKWY',
+    'CIRCLE': 'CIR',
+    'TRAIL': 'TRL',
+    'APARTMENT': 'UNIT',
+    'APT': 'UNIT',
+    'STE': 'UNIT',
+    'SUITE': 'UNIT',
+    'FL': 'UNIT',
+    'FLOOR': 'UNIT',
+}
+
+# Directions
+DIRECTIONS = {
+    'NORTH': 'N',
+    'SOUTH': 'S',
+    'EAST': 'E',
+    'WEST': 'W',
+    'NORTHEAST': 'NE',
+    'NORTHWEST': 'NW',
+    'SOUTHEAST': 'SE',
+    'SOUTHWEST': 'SW',
+}
+
+# No abbreviation is itself a key, so one pass over whole words gives the same result
+# as applying each replacement in turn
+_ABBREVIATIONS = {**SUFFIXES, **DIRECTIONS}
+_ABBREVIATION_RE = re.compile(r'\b(?:' + '|'.join(_ABBREVIATIONS) + r')\b')
+
+def _abbreviate(match):
+    return _ABBREVIATIONS[match.group()]
+
+# The same property is listed on several sites, so backfills and syncs keep normalizing the
+# same raw strings; memoize them (bounded, so long-running scrapers don't grow without limit)
+@functools.lru_cache(maxsize=100_000)
 def normalize_address(address):
     """
     Normalizes a US address for consistent hashing.
@@ -15,52 +66,14 @@ def normalize_address(address):
     addr = str(address).upper().strip()
     
     # Remove common punctuation
-    addr = re.sub(r'[.,#\-]', ' ', addr)
-    addr = re.sub(r'\s+', ' ', addr).strip()
-    
-    # Common Suffix Abbreviations
-    suffixes = {
-        r'\bSTREET\b': 'ST',
-        r'\bAVENUE\b': 'AVE',
-        r'\bBOULEVARD\b': 'BLVD',
-        r'\bDRIVE\b': 'DR',
-        r'\bLANE\b': 'LN',
-        r'\bCOURT\b': 'CT',
-        r'\bROAD\b': 'RD',
-        r'\bPLACE\b': 'PL',
-        r'\bSQUARE\b': 'SQ',
-        r'\bTERRACE\b': 'TER',
-        r'\bPARKWAY\b': 'PKWY',
-        r'\bCIRCLE\b': 'CIR',
-        r'\bTRAIL\b': 'TRL',
-        r'\bAPARTMENT\b': 'UNIT',
-        r'\bAPT\b': 'UNIT',
-        r'\bSTE\b': 'UNIT',
-        r'\bSUITE\b': 'UNIT',
-        r'\bFL\b': 'UNIT',
-        r'\bFLOOR\b': 'UNIT',
-    }
-    
-    for pattern, replacement in suffixes.items():
-        addr = re.sub(pattern, replacement, addr)
-        
-    # Directions
-    directions = {
-        r'\bNORTH\b': 'N',
-        r'\bSOUTH\b': 'S',
-        r'\bEAST\b': 'E',
-        r'\bWEST\b': 'W',
-        r'\bNORTHEAST\b': 'NE',
-        r'\bNORTHWEST\b': 'NW',
-        r'\bSOUTHEAST\b': 'SE',
-        r'\bSOUTHWEST\b': 'SW',
-    }
+    addr = _PUNCTUATION_RE.sub(' ', addr)
+    addr = _WHITESPACE_RE.sub(' ', addr).strip()
     
-    for pattern, replacement in directions.items():
-        addr = re.sub(pattern, replacement, addr)
+    # Suffixes and directions
+    addr = _ABBREVIATION_RE.sub(_abbreviate, addr)
         
     # Remove extra spaces again after replacements
-    addr = re.sub(r'\s+', ' ', addr).strip()
+    addr = _WHITESPACE_RE.sub(' ', addr).strip()
     
     return addr
 
@@ -71,3 +84,16 @@ def generate_address_hash(normalized_address):
     if not normalized_address:
         return None
     return hashlib.md5(normalized_address.encode('utf-8')).hexdigest()
+
+def normalize_addresses(addresses):
+    """
+    normalize_address over a whole batch (e.g. one page of listings), in order.
+    """
+    return [normalize_address(address) for address in addresses]
+
+def generate_address_hashes(normalized_addresses):
+    """
+    generate_address_hash over a whole batch of normalized addresses, in order.
+    """
+    md5 = hashlib.md5
+    return [md5(n.encode('utf-8')).hexdigest() if n else None for n in normalized_addresses]
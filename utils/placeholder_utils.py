@@ -25,6 +25,17 @@ PLACEHOLDER_PHONE_PATTERNS = [
     r'\(800\) 000-0000',
 ]
 
+# Names that are a platform/office rather than an owner
+PLACEHOLDER_NAMES = ['support', 'admin', 'hotpads support', 'listing agent', 'property manager', 'leasing office', 'null', 'none']
+
+# Lookup forms of the lists above, built once: these checks run for every owner row a
+# backfill reads, so each one is a single set/suffix/regex test instead of a Python loop
+_PLACEHOLDER_EMAILS = frozenset(PLACEHOLDER_EMAILS)
+_PLACEHOLDER_DOMAIN_SUFFIXES = tuple(f"@{domain}" for domain in PLACEHOLDER_DOMAINS)
+_PLACEHOLDER_PHONE_RE = re.compile('|'.join(PLACEHOLDER_PHONE_PATTERNS))
+_PLACEHOLDER_NAMES = frozenset(PLACEHOLDER_NAMES)
+_NON_DIGIT_RE = re.compile(r'\D')
+
 def is_placeholder_email(email):
     """
     Checks if an email is a platform placeholder.
@@ -34,14 +45,7 @@ def is_placeholder_email(email):
     
     email = str(email).lower().strip()
     
-    if email in PLACEHOLDER_EMAILS:
-        return True
-        
-    for domain in PLACEHOLDER_DOMAINS:
-        if email.endswith(f"@{domain}"):
-            return True
-            
-    return False
+    return email in _PLACEHOLDER_EMAILS or email.endswith(_PLACEHOLDER_DOMAIN_SUFFIXES)
 
 def is_placeholder_phone(phone):
     """
@@ -50,18 +54,15 @@ def is_placeholder_phone(phone):
     if not phone:
         return True
         
-    phone_clean = re.sub(r'\D', '', str(phone))
+    phone = str(phone)
+    phone_clean = _NON_DIGIT_RE.sub('', phone)
     
     # Check if it's all same digits (0000000000)
     if len(phone_clean) >= 10 and len(set(phone_clean)) == 1:
         return True
         
     # Check common fake patterns
-    for pattern in PLACEHOLDER_PHONE_PATTERNS:
-        if re.search(pattern, str(phone)):
-            return True
-            
-    return False
+    return _PLACEHOLDER_PHONE_RE.search(phone) is not None
 
 def clean_owner_data(owner_name, email, phone):
     """
@@ -72,7 +73,7 @@ def clean_owner_data(owner_name, email, phone):
     
     # If name is just "Support" or "Admin", it's likely a placeholder
     clean_name = owner_name
-    if owner_name and str(owner_name).lower().strip() in ['support', 'admin', 'hotpads support', 'listing agent', 'property manager', 'leasing office', 'null', 'none']:
+    if owner_name and str(owner_name).lower().strip() in _PLACEHOLDER_NAMES:
         clean_name = None
         
     return clean_name, clean_email, clean_phone
@@ -82,9 +83,7 @@ def is_valid_owner_name(name):
     if not name:
         return False
     name_lower = str(name).lower().strip()
-    invalid_names = ['support', 'admin', 'hotpads support', 'listing agent', 
-                     'property manager', 'leasing office', 'null', 'none', '']
-    return name_lower not in invalid_names
+    return name_lower != '' and name_lower not in _PLACEHOLDER_NAMES
 
 def is_owner_data_complete(owner_name, owner_email, owner_phone, mailing_address=None):
     """
@@ -95,7 +94,11 @@ def is_owner_data_complete(owner_name, owner_email, owner_phone, mailing_address
     clean_name, clean_email, clean_phone = clean_owner_data(owner_name, owner_email, owner_phone)
     
     # Check mailing address validity (simple check for non-empty string)
-    has_mailing = mailing_address is not None and str(mailing_address).strip() != "" and str(mailing_address).lower() != "null" and str(mailing_address).lower() != "none"
+    if mailing_address is None:
+        has_mailing = False
+    else:
+        mailing = str(mailing_address)
+        has_mailing = mailing.strip() != "" and mailing.lower() not in ("null", "none")
     
     missing = {
         "owner_name": clean_name is None,
@@ -0,0 +1,25 @@
+# PostgREST answers an .rpc() call for a function that isn't in its schema cache with PGRST202 / 404
+_MISSING_FUNCTION_CODES = ("PGRST202", "404", 404)
+
+
+def is_missing_function(error):
+    """True if a Supabase .rpc() call failed because the SQL function isn't installed.
+
+    Anything else (timeout, dropped connection, lock conflict, bad row) is transient or specific
+    to that call, so callers should fall back for that call only and try the function again next time.
+    """
+    if getattr(error, "code", None) in _MISSING_FUNCTION_CODES:
+        return True
+    message = str(error)
+    return "PGRST202" in message or "Could not find the function" in message
+
+
+def is_rejected_data(error):
+    """True if PostgREST rejected the rows themselves: a Postgres data exception (SQLSTATE class 22,
+    e.g. invalid input syntax) or integrity constraint violation (class 23, e.g. NOT NULL / unique).
+
+    Those are specific to some rows in the request, so retrying a subset can succeed. Outages,
+    timeouts, 5xx and auth errors fail every subset the same way and must not be split.
+    """
+    code = getattr(error, "code", None)
+    return isinstance(code, str) and len(code) == 5 and code[:2] in ("22", "23")
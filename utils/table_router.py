@@ -4,10 +4,23 @@ Table Router
 Maps detected platforms to their corresponding database tables and scraper configurations.
 """
 
-from typing import Optional, Dict, Tuple
+import sys
+from functools import partial
+from typing import Optional, Dict, List, Tuple
+from urllib.parse import SplitResult
 from utils.url_detector import URLDetector
 
 
+def _script_cmd(script: str, url: str) -> List[str]:
+    """Command for a standalone scraper script that takes the start URL as --url."""
+    return [sys.executable, script, '--url', url]
+
+
+def _scrapy_cmd(command: Tuple[str, ...], url_param: str, url: str) -> List[str]:
+    """Command for a Scrapy spider that takes the start URL as a spider argument."""
+    return [sys.executable, *command, f"{url_param}={url}"]
+
+
 class TableRouter:
     """Routes platforms to database tables and scraper configurations."""
     
@@ -68,6 +81,15 @@ class TableRouter:
         },
     }
     
+    # Each config gets build_cmd(url) -> argv, bound once here so routing a request is a single call
+    for _config in PLATFORM_TO_SCRAPER.values():
+        if _config['command'][0].endswith('.py'):
+            # FSBO uses a different command structure - supports --url argument
+            _config['build_cmd'] = partial(_script_cmd, _config['command'][0])
+        else:
+            _config['build_cmd'] = partial(_scrapy_cmd, tuple(_config['command']), _config['url_param'])
+    del _config
+    
     @classmethod
     def get_table_for_platform(cls, platform: Optional[str]) -> Optional[str]:
         """
@@ -99,18 +121,19 @@ class TableRouter:
         return cls.PLATFORM_TO_SCRAPER.get(platform)
     
     @classmethod
-    def route_url(cls, url: str) -> Tuple[Optional[str], Optional[str], Optional[Dict], Dict]:
+    def route_url(cls, url: str, parts: Optional[SplitResult] = None) -> Tuple[Optional[str], Optional[str], Optional[Dict], Dict]:
         """
         Route a URL to the appropriate table and scraper configuration.
         
         Args:
             url: The URL to route
+            parts: Optional urlsplit(url) result, if the caller has already parsed the URL
             
         Returns:
             Tuple of (platform, table_name, scraper_config, location_dict)
             Returns None values for unknown platforms
         """
-        platform, location = URLDetector.detect_and_extract(url)
+        platform, location = URLDetector.detect_and_extract(url, parts)
         
         if not platform:
             return None, None, None, location
@@ -6,7 +6,7 @@ This module detects the platform from a URL and extracts location information.
 
 import re
 from typing import Optional, Dict, Tuple
-from urllib.parse import urlparse, parse_qs
+from urllib.parse import urlparse, parse_qs, SplitResult
 
 
 class URLDetector:
@@ -51,6 +51,20 @@ class URLDetector:
         },
     }
     
+    # Built once from PLATFORM_PATTERNS: exact domain -> platform (first platform listing a domain wins),
+    # and each platform's regexes compiled
+    DOMAIN_TO_PLATFORM = {}
+    for _platform, _config in PLATFORM_PATTERNS.items():
+        for _domain in _config['domains']:
+            DOMAIN_TO_PLATFORM.setdefault(_domain.replace('www.', ''), _platform)
+    COMPILED_PATTERNS = {
+        _platform: (re.compile(_config['pattern']), re.compile(_config['location_pattern']))
+        for _platform, _config in PLATFORM_PATTERNS.items()
+    }
+    del _platform, _config, _domain
+    
+    ZIPCODE_RE = re.compile(r'^\d{5}$')
+    
     # State abbreviations for validation
     US_STATES = {
         'AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA',
@@ -61,12 +75,13 @@ class URLDetector:
     }
     
     @classmethod
-    def detect_platform(cls, url: str) -> Optional[str]:
+    def detect_platform(cls, url: str, parts: Optional[SplitResult] = None) -> Optional[str]:
         """
         Detect the platform from a URL.
         
         Args:
             url: The URL to analyze
+            parts: Optional urlsplit(url) result, reused instead of parsing the URL again
             
         Returns:
             Platform identifier or None if unknown
@@ -75,38 +90,33 @@ class URLDetector:
             return None
             
         url_lower = url.lower()
-        parsed = urlparse(url_lower)
-        domain = parsed.netloc.replace('www.', '')
+        netloc = parts.netloc.lower() if parts is not None else urlparse(url_lower).netloc
+        domain = netloc.replace('www.', '')
         
-        # Check each platform pattern
-        for platform, config in cls.PLATFORM_PATTERNS.items():
-            # Check domain match
-            if domain in config['domains']:
-                # For Zillow, check if it's FSBO or FRBO based on URL pattern
-                if platform.startswith('zillow_'):
-                    # Check for rentals/FRBO patterns first (more specific)
-                    # Accept both /rentals/ and /for_rent/ or /for-rent/ patterns
-                    if '/rentals/' in url_lower or '/for_rent/' in url_lower or '/for-rent/' in url_lower or 'for_rent' in url_lower or 'for-rent' in url_lower or 'frbo' in url_lower:
-                        return 'zillow_frbo'
-                    elif '/fsbo/' in url_lower or '/for_sale/' in url_lower or '/for-sale/' in url_lower or 'for_sale' in url_lower or 'for-sale' in url_lower or 'fsbo' in url_lower:
-                        return 'zillow_fsbo'
-                    # Default to FSBO if unclear
-                    return 'zillow_fsbo'
-                return platform
-            
-            # Check pattern match as fallback
-            if re.search(config['pattern'], url_lower):
-                if platform.startswith('zillow_'):
-                    # Check for rentals/FRBO patterns first (more specific)
-                    # Accept both /rentals/ and /for_rent/ or /for-rent/ patterns
-                    if '/rentals/' in url_lower or '/for_rent/' in url_lower or '/for-rent/' in url_lower or 'for_rent' in url_lower or 'for-rent' in url_lower or 'frbo' in url_lower:
-                        return 'zillow_frbo'
-                    elif '/fsbo/' in url_lower or '/for_sale/' in url_lower or '/for-sale/' in url_lower or 'for_sale' in url_lower or 'for-sale' in url_lower or 'fsbo' in url_lower:
-                        return 'zillow_fsbo'
-                    return 'zillow_fsbo'
-                return platform
+        # Check domain match (single dict lookup)
+        platform = cls.DOMAIN_TO_PLATFORM.get(domain)
         
-        return None
+        # Check pattern match as fallback
+        if not platform:
+            for candidate, (pattern, _) in cls.COMPILED_PATTERNS.items():
+                if pattern.search(url_lower):
+                    platform = candidate
+                    break
+        
+        # For Zillow, check if it's FSBO or FRBO based on URL pattern
+        if platform and platform.startswith('zillow_'):
+            return cls._zillow_platform(url_lower)
+        return platform
+    
+    @staticmethod
+    def _zillow_platform(url_lower: str) -> str:
+        """Decide between zillow_frbo and zillow_fsbo for a lowercased Zillow URL."""
+        # Check for rentals/FRBO patterns first (more specific)
+        # Accept both /rentals/ and /for_rent/ or /for-rent/ patterns
+        if '/rentals/' in url_lower or 'for_rent' in url_lower or 'for-rent' in url_lower or 'frbo' in url_lower:
+            return 'zillow_frbo'
+        # Default to FSBO if unclear (also covers /fsbo/, for_sale and for-sale)
+        return 'zillow_fsbo'
     
     @classmethod
     def extract_location(cls, url: str, platform: Optional[str] = None) -> Dict[str, Optional[str]]:
@@ -132,63 +142,62 @@ class URLDetector:
             return location
         
         url_lower = url.lower()
-        config = cls.PLATFORM_PATTERNS.get(platform)
+        compiled = cls.COMPILED_PATTERNS.get(platform)
         
-        if not config or 'location_pattern' not in config:
+        if not compiled:
             return location
         
         # Extract location based on platform pattern
-        pattern = config.get('location_pattern')
-        if pattern:
-            match = re.search(pattern, url_lower)
-            if match:
-                if platform == 'apartments.com':
-                    # Format: city-state (e.g., chicago-il)
-                    city_state = match.group(1)
-                    parts = city_state.split('-')
-                    if len(parts) >= 2:
-                        # Last part might be state abbreviation
-                        potential_state = parts[-1].upper()
-                        if potential_state in cls.US_STATES:
-                            location['state'] = potential_state
-                            location['city'] = '-'.join(parts[:-1]).title()
-                        else:
-                            location['city'] = city_state.title()
-                
-                elif platform in ['redfin', 'trulia', 'zillow_fsbo', 'zillow_frbo', 'fsbo']:
-                    # Format: /state/city or /state/city-name
-                    if len(match.groups()) >= 2:
-                        state = match.group(1).upper()
-                        city = match.group(2).replace('-', ' ').title()
-                        if state in cls.US_STATES:
-                            location['state'] = state
-                            location['city'] = city
-                
-                elif platform == 'hotpads':
-                    # Format: /location or /zipcode
-                    location_str = match.group(1)
-                    # Try to detect if it's a zipcode (5 digits)
-                    if re.match(r'^\d{5}$', location_str):
-                        # It's a zipcode, we can't extract city/state from it easily
-                        pass
+        match = compiled[1].search(url_lower)
+        if match:
+            if platform == 'apartments.com':
+                # Format: city-state (e.g., chicago-il)
+                city_state = match.group(1)
+                parts = city_state.split('-')
+                if len(parts) >= 2:
+                    # Last part might be state abbreviation
+                    potential_state = parts[-1].upper()
+                    if potential_state in cls.US_STATES:
+                        location['state'] = potential_state
+                        location['city'] = '-'.join(parts[:-1]).title()
                     else:
-                        # Assume it's a city name
-                        location['city'] = location_str.replace('-', ' ').title()
+                        location['city'] = city_state.title()
+            
+            elif platform in ['redfin', 'trulia', 'zillow_fsbo', 'zillow_frbo', 'fsbo']:
+                # Format: /state/city or /state/city-name
+                if len(match.groups()) >= 2:
+                    state = match.group(1).upper()
+                    city = match.group(2).replace('-', ' ').title()
+                    if state in cls.US_STATES:
+                        location['state'] = state
+                        location['city'] = city
+            
+            elif platform == 'hotpads':
+                # Format: /location or /zipcode
+                location_str = match.group(1)
+                # Try to detect if it's a zipcode (5 digits)
+                if cls.ZIPCODE_RE.match(location_str):
+                    # It's a zipcode, we can't extract city/state from it easily
+                    pass
+                else:
+                    # Assume it's a city name
+                    location['city'] = location_str.replace('-', ' ').title()
         
         return location
     
     @classmethod
-    def detect_and_extract(cls, url: str) -> Tuple[Optional[str], Dict[str, Optional[str]]]:
+    def detect_and_extract(cls, url: str, parts: Optional[SplitResult] = None) -> Tuple[Optional[str], Dict[str, Optional[str]]]:
         """
         Detect platform and extract location in one call.
         
         Args:
             url: The URL to analyze
+            parts: Optional urlsplit(url) result, if the caller has already parsed the URL
             
         Returns:
             Tuple of (platform, location_dict)
         """
-        platform = cls.detect_platform(url)
+        platform = cls.detect_platform(url, parts)
         location = cls.extract_location(url, platform)
         return platform, location
 